@@ -790,6 +790,11 @@ class VideoProcessor:
         except Exception:
             logger.warning("Font not found, using default.")
             font = ImageFont.load_default()
+        if hasattr(font, 'getbbox'):
+            line_bbox = font.getbbox("Xp")
+            single_line_height = line_bbox[3] - line_bbox[1] + line_padding
+        else:
+            single_line_height = font.getsize("Xp")[1] + line_padding
         value_column_width = img_width - key_column_width - key_value_gap - (2 * side_margin)
         total_height = 10
         prepared_lines = []
@@ -808,7 +813,11 @@ class VideoProcessor:
             current_line = ""
             for word in str(value).split():
                 test_line = current_line + (" " if current_line else "") + word
-                line_width = font.getbbox(test_line)[2] - font.getbbox(test_line)[0] if hasattr(font, 'getbbox') else font.getsize(test_line)[0]
+                if hasattr(font, 'getbbox'):
+                    bbox = font.getbbox(test_line)
+                    line_width = bbox[2] - bbox[0]
+                else:
+                    line_width = font.getsize(test_line)[0]
                 if line_width <= value_column_width:
                     current_line = test_line
                 else:
@@ -820,7 +829,6 @@ class VideoProcessor:
             if not wrapped_value_lines:
                 wrapped_value_lines = ["N/A"]
             prepared_lines.append((f"{key}:", wrapped_value_lines))
-            single_line_height = (font.getbbox("Xp")[3] - font.getbbox("Xp")[1] + line_padding) if hasattr(font, 'getbbox') else font.getsize("Xp")[1] + line_padding
             total_height += len(wrapped_value_lines) * single_line_height
         total_height += 10
         img = Image.new("RGB", (img_width, total_height), color=(0, 0, 0))
@@ -834,7 +842,6 @@ class VideoProcessor:
             current_line_y = y
             for line in value_lines:
                 draw.text((value_x, current_line_y), line, font=font, fill=(230, 230, 230))
-                single_line_height = (font.getbbox("Xp")[3] - font.getbbox("Xp")[1] + line_padding) if hasattr(font, 'getbbox') else font.getsize("Xp")[1] + line_padding
                 current_line_y += single_line_height
             y = current_line_y
         output_path = self.temp_dir / f"{self.base_filename}_info.png"
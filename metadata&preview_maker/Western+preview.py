@@ -742,6 +742,11 @@ class VideoProcessor:
         except Exception:
             logger.warning(f"Font '{self.config.FONT_PATH}' not found. Using default.")
             font = ImageFont.load_default()
+        try:
+            line_bbox = font.getbbox("Xp")
+            single_line_height = line_bbox[3] - line_bbox[1] + line_padding
+        except AttributeError:
+            single_line_height = font.getsize("Xp")[1] + line_padding
         value_column_width = img_width - key_column_width - key_value_gap - (2 * side_margin)
         total_height = 10
         prepared_lines = []
@@ -785,11 +790,6 @@ class VideoProcessor:
                 wrapped_value_lines = ["N/A"]
             key_text = f"{key}:" if key else ""
             prepared_lines.append((key_text, wrapped_value_lines))
-            try:
-                line_bbox = font.getbbox("Xp")
-                single_line_height = line_bbox[3] - line_bbox[1] + line_padding
-            except AttributeError:
-                single_line_height = font.getsize("Xp")[1] + line_padding
             total_height += len(wrapped_value_lines) * single_line_height
         total_height += 10
         img = Image.new("RGB", (img_width, total_height), color=(0, 0, 0))
@@ -804,11 +804,6 @@ class VideoProcessor:
             current_line_y = y
             for line in value_lines:
                 draw.text((value_x, current_line_y), line, font=font, fill=text_color)
-                try:
-                    line_bbox = font.getbbox("Xp")
-                    single_line_height = line_bbox[3] - line_bbox[1] + line_padding
-                except AttributeError:
-                    single_line_height = font.getsize("Xp")[1] + line_padding
                 current_line_y += single_line_height
             y = current_line_y
         output_path = self.temp_dir / f"{self.base_filename}_info.png"
@@ -1,30 +1,92 @@
 #!/usr/bin/env python3
 import os
 import re
+import json
 import requests
-from bs4 import BeautifulSoup, NavigableString # Import NavigableString
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
 import logging
 from urllib.parse import urljoin, urlparse
+from urllib3.util.request import ACCEPT_ENCODING # "gzip,deflate", plus ",br" when the brotli package is installed
 import sys
 import time
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 VIDEO_DIR = "/home/s/Videos/" # Make sure this exists and is writable
+VIDEO_DIR_PREFIX = os.path.join(VIDEO_DIR, '') # VIDEO_DIR with exactly one trailing separator
 BASE_URL = "https://www.javdatabase.com/"
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
     'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': ACCEPT_ENCODING, # Only advertise what urllib3 can actually decode
     'Referer': BASE_URL,
 }
 IMG_HEADERS = HEADERS.copy()
 IMG_HEADERS['Accept'] = 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8'
+MAX_WORKERS = 8 # Videos scraped concurrently; the work is network-bound, so threads are enough
+DOWNLOAD_CHUNK_SIZE = 1 << 18 # 256 KiB per read from the socket
+DOWNLOAD_BUFFER_SIZE = 1 << 20 # Bytes gathered before each (vectored) write to the file
+IMAGE_WORKERS = 8 # Screenshots downloaded concurrently, shared by all movies (see IMAGE_EXECUTOR)
+DOWNLOAD_RATE = 3.0 # Sustained image requests per second, per host
+DOWNLOAD_BURST = 8 # Requests a host may receive back-to-back before DOWNLOAD_RATE applies
+MANIFEST_FILENAME = ".jav.json" # Per-movie record of the last complete scrape (metadata + page validators); delete it to force a full scrape
+
+# --- HTTP Session (keep-alive + connection pooling) ---
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=3)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+# One screenshot pool for every movie thread: at most MAX_WORKERS (pages/covers) + IMAGE_WORKERS requests are in
+# flight, which must stay within pool_maxsize or urllib3 discards connections ("Connection pool is full")
+IMAGE_EXECUTOR = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # --- Regex for JAV Code ---
 JAV_CODE_REGEX = re.compile(r'([A-Za-z]{2,5})-?(\d{2,5})', re.IGNORECASE)
+# Same pattern applied per line of a newline-joined listing: exactly one match per line,
+# with empty groups when that line has no code
+JAV_CODE_LINE_REGEX = re.compile(r'^(?:.*?' + JAV_CODE_REGEX.pattern + r')?.*$', re.IGNORECASE | re.MULTILINE)
+WS_COLLAPSE = re.compile(r'\s+')
+EXT_RE = re.compile(r'(\.[A-Za-z0-9]{2,5})(?:$|[?#])') # File extension at the end of a URL's path
+PLOT_DISCLAIMER = "JAV Database only provides"
+
+@functools.lru_cache(maxsize=256)
+def _plot_regex(code):
+    return re.compile(r'About\s+' + re.escape(code) + r'\s+JAV Movie', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _images_regex(code):
+    return re.compile(f'{code}.* Images', re.IGNORECASE)
+
+# --- Compiled Selectors ---
+# CSS selectors are translated to XPath once at import and compiled; calling one is a single C-level query.
+_css = HTMLTranslator()
+
+def css_xpath(selector, prefix='descendant-or-self::', suffix='', first=False):
+    expression = _css.css_to_xpath(selector, prefix=prefix) + suffix
+    return etree.XPath(f"({expression})[1]" if first else expression)
+
+XP_TITLE = css_xpath('header.entry-header h1')
+XP_DETAILS_ROW = css_xpath('div.entry-content div.row', first=True)
+XP_DETAILS_COLUMN = css_xpath('div.col-md-10, div.col-lg-10, div.col-8', prefix='descendant::', first=True)
+XP_DETAILS_P = css_xpath('p.mb-1', prefix='') # Direct children only
+XP_FALLBACK_CAST = css_xpath('div.entry-content a[href*="/idols/"]')
+XP_SUBHEADS = css_xpath('h4.subhead')
+XP_COVER = css_xpath('#poster-container img', suffix='/@src')
+XP_SS_CONTAINER = css_xpath('div.container', prefix='following-sibling::', first=True)
+XP_SS = css_xpath('div.row.g-3 a[data-image-href]', suffix='/@data-image-href')
+XP_NORMALIZED_TEXT = etree.XPath("normalize-space(string(.))")
+# Text nodes and <p> after the plot heading, up to (not including) the post-ratings div
+XP_PLOT_NODES = etree.XPath("following-sibling::node()[self::text() or self::p]"
+                            "[not(preceding-sibling::div[.//*[starts-with(@id, 'post-ratings')]])]")
 
 # --- Helper Functions ---
 def extract_jav_code(filename):
@@ -36,18 +98,99 @@ def extract_jav_code(filename):
         return f"{prefix}-{number}"
     return None
 
+_parser_local = threading.local()
+
+def html_parser():
+    # lxml parsers must not be shared between threads, so each worker keeps its own.
+    # Comments and processing instructions are never read, so they are not built into the tree.
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True, collect_ids=False)
+    return parser
+
+def extract_jav_codes(filenames):
+    # Scan every name in one regex pass instead of one search() call per file
+    stems = '\n'.join(os.path.splitext(name)[0] for name in filenames)
+    codes = [f"{match.group(1).upper()}-{match.group(2)}" if match.group(1) else None
+             for match in JAV_CODE_LINE_REGEX.finditer(stems)]
+    if len(codes) != len(filenames): # A newline inside a filename breaks the line mapping
+        codes = [extract_jav_code(name) for name in filenames]
+    return codes
+
+def find_subhead(tree, pattern):
+    return next((h4 for h4 in XP_SUBHEADS(tree) if pattern.search(h4.text_content())), None)
+
+class TokenBucket:
+    """Per-host rate limiter: up to `capacity` requests at once, refilled at `rate` per second."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1 # Reserve a token now; sleep off any deficit outside the lock
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def rate_limiter(url):
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = TokenBucket(DOWNLOAD_RATE, DOWNLOAD_BURST)
+    return limiter
+
+def write_chunks(f, chunks):
+    # Hand all gathered chunks to the kernel in one writev; it may write fewer bytes, so resume from there
+    if not hasattr(os, 'writev'):
+        f.write(b''.join(chunks))
+        return
+    views = [memoryview(chunk) for chunk in chunks]
+    while views:
+        written = os.writev(f.fileno(), views)
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if views and written:
+            views[0] = views[0][written:]
+
 def download_image(url, filepath, referer=None):
     try:
         dl_headers = IMG_HEADERS.copy()
         if referer:
             dl_headers['Referer'] = referer
         logging.info(f"Attempting to download image: {url}")
-        time.sleep(0.3)
-        response = requests.get(url, headers=dl_headers, stream=True, timeout=45)
+        rate_limiter(url).acquire()
+        response = SESSION.get(url, headers=dl_headers, stream=True, timeout=45)
         response.raise_for_status()
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        content_length = response.headers.get('Content-Length', '')
+        with open(filepath, 'wb', buffering=0) as f: # Unbuffered: writes are batched below
+            # Reserve the file's extents up front when the on-disk size is known (no content coding)
+            if hasattr(os, 'posix_fallocate') and content_length.isdigit() and 'Content-Encoding' not in response.headers:
+                try:
+                    os.posix_fallocate(f.fileno(), 0, int(content_length))
+                except OSError:
+                    pass # Filesystem doesn't support it; plain writes still work
+            pending, pending_bytes = [], 0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= DOWNLOAD_BUFFER_SIZE:
+                    write_chunks(f, pending)
+                    pending, pending_bytes = [], 0
+            if pending:
+                write_chunks(f, pending)
+            f.truncate() # Drop any preallocated tail if the body came up short
+            f.flush()
         logging.info(f"Successfully downloaded: {filepath}")
         os.chmod(filepath, 0o664) # Set permissions after successful download
         return True
@@ -64,35 +207,55 @@ def download_image(url, filepath, referer=None):
         if os.path.exists(filepath): os.remove(filepath)
         return False
 
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_manifest(output_dir, manifest):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    except OSError as e:
+        logging.warning(f"Failed to write manifest in {output_dir}: {e}")
+
 def create_metadata_file(filepath, data):
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(f"[title]\n{data.get('title_long', 'N/A')}\n\n")
-            f.write("[details]\n")
-            f.write(f"ID: {data.get('id', 'N/A')}\n")
-            f.write(f"Content ID: {data.get('content_id', 'N/A')}\n")
-            f.write(f"Release Date: {data.get('release_date', 'N/A')}\n")
-            f.write(f"Runtime: {data.get('runtime', 'N/A')}\n")
-            f.write(f"Studio: {data.get('studio', 'N/A')}\n")
-            f.write(f"Director: {data.get('director', 'N/A')}\n\n")
-            f.write("[cast]\n")
-            cast_list = data.get('cast', [])
-            f.write('\n'.join(cast_list if cast_list else ['N/A']) + '\n\n')
-            f.write("[plot]\n")
-            plot_text = data.get('plot', 'N/A')
-            f.write(plot_text if plot_text else 'N/A') # Write plot, handle None
-            f.write('\n\n') # Add newline after plot regardless
-            f.write("[tags]\n")
-            f.write(', '.join(data.get('genres', ['N/A'])) + '\n\n')
-            f.write("[cover]\n")
-            f.write(f"{data.get('cover_filename', 'N/A')}\n\n")
-            f.write("[screens]\n")
-            f.write('\n'.join(f"[img]{s}[/img]" for s in data.get('screenshot_filenames', [])))
-            f.write('\n')
+        cast_list = data.get('cast', [])
+        plot_text = data.get('plot', 'N/A')
+        parts = [
+            f"[title]\n{data.get('title_long', 'N/A')}\n\n",
+            "[details]\n",
+            f"ID: {data.get('id', 'N/A')}\n",
+            f"Content ID: {data.get('content_id', 'N/A')}\n",
+            f"Release Date: {data.get('release_date', 'N/A')}\n",
+            f"Runtime: {data.get('runtime', 'N/A')}\n",
+            f"Studio: {data.get('studio', 'N/A')}\n",
+            f"Director: {data.get('director', 'N/A')}\n\n",
+            "[cast]\n",
+            '\n'.join(cast_list if cast_list else ['N/A']) + '\n\n',
+            "[plot]\n",
+            plot_text if plot_text else 'N/A', # Write plot, handle None
+            '\n\n', # Add newline after plot regardless
+            "[tags]\n",
+            ', '.join(data.get('genres', ['N/A'])) + '\n\n',
+            "[cover]\n",
+            f"{data.get('cover_filename', 'N/A')}\n\n",
+            "[screens]\n",
+            '\n'.join(f"[img]{s}[/img]" for s in data.get('screenshot_filenames', [])),
+            '\n',
+        ]
+        # Build the whole file in memory and hand it to the OS in one write
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(''.join(parts))
         logging.info(f"Metadata file created: {filepath}")
         os.chmod(filepath, 0o664) # Set permissions after writing
+        return True
     except Exception as e:
         logging.error(f"Failed to write metadata file {filepath}: {e}")
+        return False
 
 # --- Main Processing Logic ---
 def process_video(filepath):
@@ -105,8 +268,9 @@ def process_video(filepath):
     logging.info(f"--- Processing: {filename} (Code: {jav_code}) ---")
     jav_code_lower = jav_code.lower()
     # Define potential output path FIRST for the offline check
-    output_dir = os.path.join(VIDEO_DIR, jav_code_lower)
-    metadata_filepath = os.path.join(output_dir, f"{jav_code_lower}.txt")
+    output_dir = VIDEO_DIR_PREFIX + jav_code_lower
+    output_prefix = output_dir + os.sep # Paths inside the folder are built by concatenation
+    metadata_filepath = f"{output_prefix}{jav_code_lower}.txt"
     cover_filename_base = f"{jav_code_lower}_cover" # Needed for checking cover existence later
 
     # --- *** OFFLINE CHECK *** ---
@@ -135,22 +299,49 @@ def process_video(filepath):
     except PermissionError:
          logging.error(f"Permission denied creating or setting permissions for {output_dir}")
          return
+    # One directory read instead of a stat per candidate cover/screenshot extension. The folder itself is the
+    # truth: this path is the recovery case (TXT missing), where images may have been deleted since the manifest.
+    existing_files = {entry.name for entry in os.scandir(output_dir)}
+    manifest = load_manifest(output_dir)
+
+    # Revalidate against the page of the last complete scrape. Its metadata (image names included) is in the
+    # manifest, so a 304 rebuilds the TXT without the page body - as long as every image it lists is still on disk.
+    conditional_headers = {}
+    saved_metadata = manifest.get('metadata') if manifest is not None else None
+    if saved_metadata:
+        saved_cover = saved_metadata.get('cover_filename', 'N/A')
+        saved_images = saved_metadata.get('screenshot_filenames', []) + ([saved_cover] if saved_cover.startswith(cover_filename_base) else [])
+        if all(name in existing_files for name in saved_images):
+            if manifest.get('etag'): conditional_headers['If-None-Match'] = manifest['etag']
+            if manifest.get('last_modified'): conditional_headers['If-Modified-Since'] = manifest['last_modified']
 
     # Fetch HTML
     logging.info(f"Fetching HTML for {jav_code} from {movie_url}")
     try:
-        page_response = requests.get(movie_url, headers=HEADERS, timeout=30)
-        page_response.raise_for_status()
-        # Check content AFTER successful status code
-        temp_soup = BeautifulSoup(page_response.content, 'lxml')
-        if not temp_soup.title or "Page not found" in temp_soup.title.string or "Nothing Found" in temp_soup.text:
+        # Session already carries HEADERS; stream so the body is decompressed and parsed as it arrives
+        page_response = SESSION.get(movie_url, headers=conditional_headers, timeout=30, stream=True)
+        if page_response.status_code == 304:
+            page_response.close()
+            logging.info(f"Page for {jav_code} unchanged since the last scrape (304). Rebuilding the metadata file from the manifest.")
+            if create_metadata_file(metadata_filepath, saved_metadata):
+                return
+            # TXT still missing: scrape the page normally (images on disk are reused)
+            page_response = SESSION.get(movie_url, timeout=30, stream=True)
+        with page_response:
+            page_response.raise_for_status()
+            page_validators = {key: value for key, value in (('etag', page_response.headers.get('ETag')),
+                                                             ('last_modified', page_response.headers.get('Last-Modified'))) if value}
+            # Check content AFTER successful status code
+            page_response.raw.decode_content = True
+            tree = lxml.html.parse(page_response.raw, parser=html_parser()).getroot()
+        page_title = tree.findtext('.//title') if tree is not None else None
+        if not page_title or "Page not found" in page_title or "Nothing Found" in tree.text_content():
              logging.error(f"Movie page not found or invalid for {jav_code} at {movie_url}")
              # Clean up empty directory if created? Optional.
              # try:
              #     if not os.listdir(output_dir): os.rmdir(output_dir)
              # except OSError: pass
              return
-        soup = temp_soup
     except requests.exceptions.RequestException as e:
         logging.error(f"Failed to fetch page {movie_url}: {e}")
         return
@@ -162,99 +353,62 @@ def process_video(filepath):
 
     try:
         # Title
-        title_h1 = soup.select_one('header.entry-header h1')
-        metadata['title_long'] = title_h1.get_text(strip=True) if title_h1 else jav_code
+        title_h1 = XP_TITLE(tree)
+        metadata['title_long'] = (title_h1[0].text_content().strip() or jav_code) if title_h1 else jav_code
 
         # Details, Cast, Genres
-        details_container = soup.select_one('div.entry-content div.row')
+        details_container = XP_DETAILS_ROW(tree)
         if details_container:
-            details_column = details_container.select_one('div.col-md-10, div.col-lg-10, div.col-8')
+            details_column = XP_DETAILS_COLUMN(details_container[0])
             if details_column:
                 logging.info(f"Parsing details section for {jav_code}...")
                 # Find all direct child paragraphs of the details column
-                details_paragraphs = details_column.find_all('p', class_='mb-1', recursive=False)
+                details_paragraphs = XP_DETAILS_P(details_column[0])
                 for p in details_paragraphs:
-                    strong_tag = p.find('b')
-                    if not strong_tag: continue
-                    label = strong_tag.get_text(strip=True).replace(':', '').strip()
-                    links = p.find_all('a')
-                    link_texts = [a.get_text(strip=True) for a in links if a.get_text(strip=True)]
-                    value_text = ''.join(node.strip() + ' ' for node in strong_tag.find_next_siblings(string=True)).strip()
+                    strong_tag = p.find('.//b')
+                    if strong_tag is None: continue
+                    label_text = XP_NORMALIZED_TEXT(strong_tag)
+                    label = label_text.replace(':', '').strip()
+                    link_texts = [text for text in (a.text_content().strip() for a in p.iter('a')) if text]
+                    # Whole paragraph text, whitespace-collapsed in C, minus the leading "<b>Label:</b>"
+                    value_text = XP_NORMALIZED_TEXT(p).replace(label_text, '', 1).strip()
 
                     if label == "Content ID": metadata['content_id'] = value_text or 'N/A'
                     elif label == "Release Date": metadata['release_date'] = value_text or 'N/A'
                     elif label == "Runtime": metadata['runtime'] = value_text or 'N/A'
                     elif label == "Studio": metadata['studio'] = link_texts[0] if link_texts else (value_text or 'N/A')
                     elif label == "Director": metadata['director'] = link_texts[0] if link_texts else (value_text or 'N/A')
-                    elif label == "Genre(s)": metadata['genres'] = sorted(list(set(link_texts))) if link_texts else []
+                    elif label == "Genre(s)": metadata['genres'] = sorted(dict.fromkeys(link_texts))
                     elif label == "Idol(s)/Actress(es)":
-                        metadata['cast'] = sorted(list(set(link_texts))) if link_texts else []
+                        metadata['cast'] = sorted(dict.fromkeys(link_texts))
                         logging.info(f"Extracted Cast: {metadata['cast']}")
 
         if not metadata.get('cast'): # Fallback
-            fallback_cast_links = soup.select('div.entry-content a[href*="/idols/"]')
-            metadata['cast'] = sorted(list(set(a.get_text(strip=True) for a in fallback_cast_links if a.get_text(strip=True))))
+            fallback_cast_links = XP_FALLBACK_CAST(tree)
+            metadata['cast'] = sorted(dict.fromkeys(text for text in (a.text_content().strip() for a in fallback_cast_links) if text))
             if metadata['cast']: logging.info(f"Found cast via fallback: {metadata['cast']}")
             else: logging.warning(f"Failed to find cast for {jav_code} via primary or fallback.")
 
 
         # --- Plot (Extract from Parent Div Content & Clean) ---
-        plot_heading_regex = re.compile(r'About\s+' + re.escape(jav_code) + r'\s+JAV Movie', re.IGNORECASE)
-        plot_heading = soup.find('h4', class_='subhead', string=plot_heading_regex)
+        plot_heading = find_subhead(tree, _plot_regex(jav_code))
         metadata['plot'] = 'N/A' # Reset default
 
-        if plot_heading:
+        if plot_heading is not None:
             logging.info(f"Found plot heading for {jav_code}.")
-            plot_parent_div = plot_heading.parent
-            if plot_parent_div:
-                logging.debug(f"Scanning contents of plot parent div: {plot_parent_div.name} ({plot_parent_div.get('class', '')})")
-                plot_text_parts = []
-                stop_extracting = False
-                # Iterate through the direct children/contents of the parent div
-                for content in plot_parent_div.contents:
-                    if stop_extracting: break
-
-                    if content == plot_heading: continue # Skip the H4 heading itself
-
-                    # Check for stop conditions BEFORE extracting text
-                    if content.name == 'div' and content.find(id=lambda x: x and x.startswith('post-ratings')):
-                        logging.debug("Stopping plot extraction at ratings div.")
-                        stop_extracting = True; break
-                    if isinstance(content, NavigableString) and "JAV Database only provides" in content:
-                        logging.debug("Stopping plot extraction at disclaimer text.")
-                        text_part = content.strip().split("JAV Database only provides")[0].strip()
-                        if text_part: plot_text_parts.append(text_part)
-                        stop_extracting = True; break
-                    if content.name == 'p' and "JAV Database only provides" in content.get_text():
-                         logging.debug("Stopping plot extraction at disclaimer text within <p>.")
-                         text_part = content.get_text(strip=True).split("JAV Database only provides")[0].strip()
-                         if text_part: plot_text_parts.append(text_part)
-                         stop_extracting = True; break
-
-                    # Extract text based on node type (get raw text chunks)
-                    text_chunk = None
-                    if isinstance(content, NavigableString):
-                        text_chunk = content.string # Get raw string content, including spaces
-                    elif content.name == 'p':
-                        text_chunk = content.get_text() # Get text from paragraphs
-                    # elif content.name == 'br': # Ignore <br> for now, handle with whitespace collapse
-                    #     pass # Or maybe add a space: text_chunk = ' '
-                    # Can add handling for other tags if needed, e.g., content.get_text()
-
-                    if text_chunk:
-                        # Append the raw chunk - cleaning happens after joining
-                        plot_text_parts.append(text_chunk)
-                        # Optional: Log the raw chunk for debugging
-                        # logging.debug(f"Added raw plot chunk: '{text_chunk[:50]}...'")
-
+            plot_parent_div = plot_heading.getparent()
+            if plot_parent_div is not None:
+                logging.debug(f"Scanning contents of plot parent div: {plot_parent_div.tag} ({plot_parent_div.get('class', '')})")
+                # The XPath already stops at the ratings div; everything from the disclaimer on is cut below
+                plot_text_parts = [str(node) if isinstance(node, str) else node.text_content() for node in XP_PLOT_NODES(plot_heading)]
 
                 # --- ** CLEANING STEP ** ---
                 # Join collected parts with a single space initially to separate words from different nodes
-                raw_joined_plot = ' '.join(plot_text_parts).strip()
+                raw_joined_plot = ' '.join(plot_text_parts).split(PLOT_DISCLAIMER, 1)[0].strip()
 
                 if raw_joined_plot:
                     # Collapse multiple whitespace chars (including newlines, tabs, etc.) into a single space
-                    cleaned_plot = re.sub(r'\s+', ' ', raw_joined_plot).strip()
+                    cleaned_plot = WS_COLLAPSE.sub(' ', raw_joined_plot).strip()
 
                     # Optional: Remove specific repeated phrases if needed (example)
                     # cleaned_plot = cleaned_plot.replace("PRED-745 is a JAV movie starring Karen Yuzuriha.", "") # Be careful with this
@@ -270,67 +424,64 @@ def process_video(filepath):
 
         # --- (Rest of the scraping logic: Cover Image, Screenshots, Create Metadata File) ---
         # --- Cover Image ---
-        cover_img_tag = soup.select_one('#poster-container img')
+        cover_srcs = XP_COVER(tree)
         cover_filename = "N/A"
-        if cover_img_tag and cover_img_tag.get('src'):
-            cover_url_relative = cover_img_tag['src']
+        download_failures = 0
+        if cover_srcs and cover_srcs[0]:
+            cover_url_relative = cover_srcs[0]
             cover_url_absolute = urljoin(movie_url, cover_url_relative)
-            cover_path = urlparse(cover_url_absolute).path
-            cover_ext = os.path.splitext(cover_path)[1] if os.path.splitext(cover_path)[1] else '.webp'
+            cover_ext_match = EXT_RE.search(cover_url_absolute)
+            cover_ext = cover_ext_match.group(1) if cover_ext_match else '.webp'
             # cover_filename_base defined earlier for offline check
             cover_filename = f"{cover_filename_base}{cover_ext}"
-            cover_filepath = os.path.join(output_dir, cover_filename)
-            existing_cover = None
-            for ext_try in ['.webp', '.jpg', '.jpeg', '.png']:
-                potential_path = os.path.join(output_dir, f"{cover_filename_base}{ext_try}")
-                if os.path.exists(potential_path):
-                    existing_cover = potential_path
-                    cover_filename = os.path.basename(existing_cover)
-                    break
+            cover_filepath = output_prefix + cover_filename
+            existing_cover = next((f"{cover_filename_base}{ext_try}" for ext_try in ['.webp', '.jpg', '.jpeg', '.png']
+                                   if f"{cover_filename_base}{ext_try}" in existing_files), None)
             if not existing_cover:
                  logging.info(f"Attempting download of cover: {cover_url_absolute}")
                  if not download_image(cover_url_absolute, cover_filepath, referer=movie_url):
                       cover_filename = "N/A (Download Failed)"
+                      download_failures += 1
                  # Permissions set in download_image on success
-            else: logging.info(f"Cover image already exists: {existing_cover}")
+            else:
+                cover_filename = existing_cover
+                logging.info(f"Cover image already exists: {output_prefix}{existing_cover}")
         else: logging.warning(f"Could not find cover image tag for {jav_code}")
         metadata['cover_filename'] = cover_filename
 
         # --- Screenshots ---
         logging.info(f"Looking for screenshots for {jav_code}...")
         screenshot_filenames = []
-        count = 0
-        screenshot_heading = soup.find('h4', class_='subhead', string=re.compile(f'{jav_code}.* Images', re.IGNORECASE))
-        if screenshot_heading:
-            screenshot_container = screenshot_heading.find_next_sibling('div', class_='container')
+        screenshot_heading = find_subhead(tree, _images_regex(jav_code))
+        if screenshot_heading is not None:
+            screenshot_container = XP_SS_CONTAINER(screenshot_heading)
             if screenshot_container:
-                screenshot_links = screenshot_container.select('div.row.g-3 a[data-image-href]')
-                logging.info(f"Found {len(screenshot_links)} screenshot links.")
-                for i, link_tag in enumerate(screenshot_links):
-                    full_size_url = link_tag.get('data-image-href')
+                screenshot_urls = XP_SS(screenshot_container[0])
+                logging.info(f"Found {len(screenshot_urls)} screenshot links.")
+                screenshot_exts = [match.group(1) if (match := EXT_RE.search(url)) else '.jpg' for url in screenshot_urls]
+                screenshot_jobs = [] # (filename, url to fetch or None if already on disk), in page order
+                for full_size_url, ss_ext in zip(screenshot_urls, screenshot_exts):
                     if not full_size_url: continue
-                    logging.debug(f"Processing screenshot URL {count + 1}: {full_size_url}") # Debug level for URL
-                    ss_path = urlparse(full_size_url).path
-                    ss_ext = os.path.splitext(ss_path)[1] if os.path.splitext(ss_path)[1] else '.jpg'
-                    screenshot_filename_base = f"{jav_code_lower}_screenshot_{count + 1:02d}"
-                    screenshot_filename = f"{screenshot_filename_base}{ss_ext}"
-                    screenshot_filepath = os.path.join(output_dir, screenshot_filename)
-                    existing_screenshot = None
-                    for ext_try in ['.jpg', '.jpeg', '.png', '.webp']:
-                        potential_path = os.path.join(output_dir, f"{screenshot_filename_base}{ext_try}")
-                        if os.path.exists(potential_path):
-                            existing_screenshot = potential_path
-                            screenshot_filename = os.path.basename(existing_screenshot)
-                            break
+                    number = len(screenshot_jobs) + 1
+                    logging.debug(f"Processing screenshot URL {number}: {full_size_url}") # Debug level for URL
+                    screenshot_filename_base = f"{jav_code_lower}_screenshot_{number:02d}"
+                    existing_screenshot = next((f"{screenshot_filename_base}{ext_try}" for ext_try in ['.jpg', '.jpeg', '.png', '.webp']
+                                                if f"{screenshot_filename_base}{ext_try}" in existing_files), None)
                     if not existing_screenshot:
-                        if download_image(full_size_url, screenshot_filepath, referer=movie_url):
-                            screenshot_filenames.append(screenshot_filename)
-                            count += 1
-                        else: logging.warning(f"Failed download screenshot {count + 1}")
+                        screenshot_jobs.append((f"{screenshot_filename_base}{ss_ext}", full_size_url))
                     else:
-                        logging.info(f"Screenshot {count + 1} already exists: {existing_screenshot}")
+                        logging.info(f"Screenshot {number} already exists: {output_prefix}{existing_screenshot}")
+                        screenshot_jobs.append((existing_screenshot, None))
+
+                # Fetch the missing ones concurrently; the per-host rate limiter still bounds the request rate
+                downloads = [(url, output_prefix + name) for name, url in screenshot_jobs if url]
+                results = iter(list(IMAGE_EXECUTOR.map(lambda job: download_image(*job, referer=movie_url), downloads)))
+                for number, (screenshot_filename, url) in enumerate(screenshot_jobs, 1):
+                    if url is None or next(results):
                         screenshot_filenames.append(screenshot_filename)
-                        count += 1
+                    else:
+                        logging.warning(f"Failed download screenshot {number}")
+                        download_failures += 1
             else: logging.warning(f"Found screenshot heading, but no container div for {jav_code}")
         else: logging.warning(f"Could not find screenshot heading for {jav_code}")
         logging.info(f"Finished processing screenshots. Got {len(screenshot_filenames)} images.")
@@ -338,8 +489,9 @@ def process_video(filepath):
 
         # --- Create Metadata File ---
         # Check if we actually got *any* useful metadata beyond the ID
+        metadata_written = False
         if metadata.get('title_long', jav_code) != jav_code or metadata.get('cast') or metadata.get('plot', 'N/A') != 'N/A':
-             create_metadata_file(metadata_filepath, metadata)
+             metadata_written = create_metadata_file(metadata_filepath, metadata)
         else:
              logging.warning(f"Failed to scrape significant metadata for {jav_code}. Not creating text file.")
              # Clean up directory? Only if no images were downloaded.
@@ -350,6 +502,10 @@ def process_video(filepath):
                  except OSError as e:
                      logging.error(f"Failed to remove empty directory {output_dir}: {e}")
 
+        # Remember a complete scrape (TXT written, every image downloaded) and the page version it came from
+        if metadata_written and not download_failures and page_validators:
+            save_manifest(output_dir, {'metadata': metadata, **page_validators})
+
 
     except Exception as e:
         logging.exception(f"An critical error occurred during scraping/processing for {jav_code}: {e}")
@@ -379,27 +535,38 @@ if __name__ == "__main__":
 
     logging.info(f"Scanning directory: {VIDEO_DIR}")
     try:
-        all_items = os.listdir(VIDEO_DIR)
-        video_files = [f for f in all_items
-                       if os.path.isfile(os.path.join(VIDEO_DIR, f)) and
-                       f.lower().endswith(('.mp4', '.mkv', '.avi', '.wmv', '.mov'))]
+        with os.scandir(VIDEO_DIR) as entries:
+            video_files = [entry.name for entry in entries
+                           if entry.is_file() and
+                           entry.name.lower().endswith(('.mp4', '.mkv', '.avi', '.wmv', '.mov'))]
         found_videos = len(video_files)
         logging.info(f"Found {found_videos} potential video files.")
 
-        for item in video_files:
+        pending_paths = []
+        queued_codes = set()
+        for item, jav_code_check in zip(video_files, extract_jav_codes(video_files)):
             # Check offline status *before* calling process_video
-            jav_code_check = extract_jav_code(item)
             if jav_code_check:
-                metadata_path_check = os.path.join(VIDEO_DIR, jav_code_check.lower(), f"{jav_code_check.lower()}.txt")
+                code_lower = jav_code_check.lower()
+                metadata_path_check = f"{VIDEO_DIR_PREFIX}{code_lower}{os.sep}{code_lower}.txt"
                 if os.path.exists(metadata_path_check):
                     logging.info(f"Offline check: Metadata exists for '{item}' ({jav_code_check}). Skipping.")
                     skipped_videos += 1
                     continue # Skip to next video file
+                # Two files with the same code would scrape into the same folder concurrently
+                if jav_code_check in queued_codes:
+                    logging.info(f"'{item}' shares code {jav_code_check} with a queued video. Skipping.")
+                    skipped_videos += 1
+                    continue
+                queued_codes.add(jav_code_check)
 
-            # If offline check passes (no file exists), proceed to process
+            # If offline check passes (no file exists), queue it for processing
             processed_videos +=1
-            item_path = os.path.join(VIDEO_DIR, item)
-            process_video(item_path) # process_video now contains the main logic
+            pending_paths.append(VIDEO_DIR_PREFIX + item)
+
+        # Scrape several videos at once; each one spends most of its time waiting on HTTP
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            list(executor.map(process_video, pending_paths)) # process_video now contains the main logic
 
     except Exception as e:
         logging.error(f"An unexpected error occurred while scanning directory: {e}")
@@ -1,19 +1,29 @@
 #!/usr/bin/env python3
 
 import os
+import stat
+import asyncio
 import string
 import subprocess
 import shutil
+import shlex
 import random
 import sys
 import unicodedata
+import textwrap
 import re
 import hashlib
 import json
-from datetime import datetime, timedelta
+import mmap
+import uuid
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from fractions import Fraction
+from functools import lru_cache
 from pathlib import Path
-from time import sleep
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Union
 
 # --- Dependency Check/Installation ---
 try:
@@ -28,25 +38,61 @@ except ImportError:
         print(f"Failed to install loguru: {e}. Please install it manually (`pip install loguru`).")
         sys.exit(1)
 
+# Pillow is only needed for the info header / image sheet, so it is imported on first use (see _require_pil)
+Image = ImageDraw = ImageFont = None
+
+def _require_pil() -> bool:
+    """Import Pillow on first use (installing it if missing). Returns False if it is unavailable."""
+    global Image, ImageDraw, ImageFont
+    if Image is not None:
+        return True
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        logger.warning("Pillow (PIL) not found, attempting to install...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "Pillow"])
+            from PIL import Image, ImageDraw, ImageFont
+            logger.success("Pillow installed successfully.")
+        except Exception as e:
+            logger.error(f"Failed to install Pillow: {e}. Please install it manually (`pip install Pillow`).")
+            return False
+    return True
+
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    import numpy as np
 except ImportError:
-    logger.warning("Pillow (PIL) not found, attempting to install...")
+    logger.warning("NumPy not found, attempting to install...")
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "Pillow"])
-        from PIL import Image, ImageDraw, ImageFont
-        logger.success("Pillow installed successfully.")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "numpy"])
+        import numpy as np
+        logger.success("NumPy installed successfully.")
     except Exception as e:
-        logger.error(f"Failed to install Pillow: {e}. Please install it manually (`pip install Pillow`).")
+        logger.error(f"Failed to install NumPy: {e}. Please install it manually (`pip install numpy`).")
         sys.exit(1)
 
-# --- NEW IMPORT FOR GUI ---
-import tkinter as tk
-from tkinter import filedialog
+# Optional: orjson parses the ffprobe JSON several times faster (and straight from bytes). Falls back to json.
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+# Optional: BLAKE3 (SIMD + multithreaded) for content hashing. Falls back to hashlib SHA-256 if missing.
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Optional: PyAV composes the WebP sheet in-process (no ffmpeg subprocess). Falls back to the ffmpeg CLI if missing.
+try:
+    import av
+except ImportError:
+    av = None
 
 # --- Configuration ---
 class Config:
     INPUT_FOLDER = r"G:\temp6" # This will be overwritten by the GUI selection
+    HEADLESS = bool(os.environ.get("PREVIEW_HEADLESS")) # Skip the folder dialog (and tkinter) and use INPUT_FOLDER
     CUSTOM_OUTPUT_PATH: Optional[str] = None
 
     CREATE_WEBP_PREVIEW = True
@@ -64,12 +110,22 @@ class Config:
     GRID_WIDTH = 4
     TIMESTAMPS_MODE = 2
     IMAGE_SHEET_FORMAT = "PNG"
-    CALCULATE_MD5 = False
+    CALCULATE_HASH = False
+    USE_MD5 = False # Legacy MD5 instead of BLAKE3/SHA-256 (slower, no hardware acceleration)
 
     KEEP_TEMP_FILES = False
+    USE_TMPFS = True # Write intermediates to RAM (/dev/shm) when it has room; ignored with KEEP_TEMP_FILES
     IGNORE_EXISTING = True
     PRINT_CUT_POINTS = False
     CONFIRM_CUT_POINTS_REQUIRED = False
+    MAX_PARALLEL_VIDEOS = max(1, (os.cpu_count() or 1) // 4) # Each video runs several multithreaded ffmpegs; 1 = sequential
+    MAX_CONCURRENT_FFMPEG = min(4, os.cpu_count() or 1) # Segment extractions run at the same time per video
+    INTERMEDIATE_CODEC = "ffv1" # Segment clips: "ffv1" (lossless, intra-only, no generation loss) or "h264" (see USE_HW_ENCODER)
+    USE_HW_ENCODER = True # With INTERMEDIATE_CODEC "h264": prefer a working NVENC/QSV/VideoToolbox encoder (and hwaccel decode)
+    HW_ENCODER = None # Set once at startup by detect_hw_encoder() (None = libx264); handed to worker processes
+    SINGLE_DECODE_MAX_SPAN_RATIO = 2.0 # One decode pass when the cut points' span is at most this x their total duration
+    USE_PYAV = True # Compose the WebP sheet in-process with PyAV when it is installed (ffmpeg CLI otherwise/on error)
+    STRICT_VERIFY = False # ffprobe every segment's duration (otherwise ffmpeg's exit code + a size check are trusted)
     BLACKLISTED_CUT_POINTS = []
     EXCLUDED_FILES = [""]
 
@@ -112,6 +168,9 @@ class Config:
                  logger.warning(f"Specified font '{cls.FONT_PATH}' not found, and no common alternatives found. Text overlay/info image might fail or use PIL default.")
         else:
             logger.debug(f"Using font: {cls.FONT_PATH}")
+        # Resolve once so every later lookup (and the get_font cache key) uses the same absolute path
+        if Path(cls.FONT_PATH).is_file():
+            cls.FONT_PATH = str(Path(cls.FONT_PATH).resolve())
 
 
         input_path = Path(cls.INPUT_FOLDER)
@@ -129,38 +188,254 @@ class Config:
             logger.warning(f"Invalid IMAGE_SHEET_FORMAT '{cls.IMAGE_SHEET_FORMAT}'. Defaulting to PNG.")
             cls.IMAGE_SHEET_FORMAT = "PNG"
 
+        if cls.INTERMEDIATE_CODEC not in ["ffv1", "h264"]:
+            logger.warning(f"Invalid INTERMEDIATE_CODEC '{cls.INTERMEDIATE_CODEC}'. Defaulting to ffv1.")
+            cls.INTERMEDIATE_CODEC = "ffv1"
+
+        # Membership-only collections: O(1) lookups (file names compared case-insensitively)
+        cls.BLACKLISTED_CUT_POINTS = frozenset(cls.BLACKLISTED_CUT_POINTS)
+        cls.EXCLUDED_FILES = frozenset(f.lower() for f in cls.EXCLUDED_FILES if f)
+        cls.VALID_VIDEO_EXTENSIONS = frozenset(ext.lower() for ext in cls.VALID_VIDEO_EXTENSIONS)
+
         logger.info("Configuration validated.")
         return True
 
+    @classmethod
+    def detect_hw_encoder(cls) -> Optional[str]:
+        """
+        Probe ffmpeg for a usable hardware H.264 encoder once and store it in HW_ENCODER. Only H.264 segment
+        intermediates are encoded with it, so with FFV1 the probe (and its test encodes) is skipped.
+        """
+        use_hw = cls.USE_HW_ENCODER and cls.INTERMEDIATE_CODEC == "h264"
+        cls.HW_ENCODER = detect_h264_encoder() if use_hw else None
+        return cls.HW_ENCODER
+
 # --- Utility Functions ---
-def run_command(command: str, cwd: Optional[str] = None) -> Tuple[str, str, int]:
-    """Execute a shell command and return stdout, stderr, and exit code."""
+STDERR_TAIL_LINES = 512 # Only the last lines of a command's stderr are kept (enough for any error report)
+PIPE_BUFFER_SIZE = 1 << 20 # Large pipe reads: fewer syscalls for big stdout payloads (raw frames, JSON)
+
+def run_command(argv: List[str], cwd: Optional[str] = None, text: bool = True) -> Tuple[Union[str, bytes], str, int]:
+    """
+    Execute a command (argv list, no shell) and return stdout, stderr, and exit code.
+    With text=False stdout is returned as raw bytes (e.g. JSON handed straight to the parser).
+    """
+    args = [str(a) for a in argv] # Quoted with shlex.join only when a failure is logged
+    try:
+        # stdin is closed so ffmpeg never waits on it. Output is decoded below (utf-8, surrogateescape).
+        # stderr is drained by a thread into a bounded ring buffer while stdout is read here (no pipe can fill up)
+        with subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              cwd=cwd, bufsize=PIPE_BUFFER_SIZE) as proc:
+            stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+            reader = threading.Thread(target=stderr_tail.extend, args=(proc.stderr,), daemon=True)
+            reader.start()
+            out = proc.stdout.read()
+            reader.join()
+            returncode = proc.wait()
+        if text:
+            stdout = out.decode('utf-8', errors='surrogateescape').strip() if out else ''
+        else:
+            stdout = out or b''
+        stderr = b"".join(stderr_tail).decode('utf-8', errors='surrogateescape').strip()
+        if returncode != 0:
+            stderr_snippet = (stderr[:500] + '...') if len(stderr) > 500 else stderr
+            logger.warning(f"Command failed (Exit Code {returncode}): {shlex.join(args)}")
+            if stderr: logger.warning(f"Stderr Snippet: {stderr_snippet}")
+        return stdout, stderr, returncode
+    except Exception as e:
+        logger.error(f"Exception running command '{shlex.join(args)}': {e}")
+        return ("" if text else b""), str(e), -1
+
+_pidfd_watcher_installed = False # Set once set_child_watcher() succeeded (skipped calls can retry later)
+
+def _use_pidfd_child_watcher():
+    """
+    Linux, Python < 3.12: reap asyncio subprocesses through pidfds polled by the event loop itself
+    instead of the default ThreadedChildWatcher (one blocking waitpid thread per child).
+    Python 3.12+ already picks pidfds when the kernel supports them.
+    Not thread-safe: PidfdChildWatcher is global but only attaches to loops on the main thread, so subprocesses
+    started from any other thread's loop fail. Call this right before an asyncio.run on the main thread (it does
+    nothing elsewhere) and keep every asyncio.run of this script on the main thread.
+    """
+    global _pidfd_watcher_installed
+    if _pidfd_watcher_installed:
+        return
+    if not sys.platform.startswith("linux") or sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return # ThreadedChildWatcher (the default) works from any thread
+    try:
+        os.close(os.pidfd_open(os.getpid())) # Kernel 5.3+ required
+        asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
+        _pidfd_watcher_installed = True
+    except (OSError, AttributeError):
+        pass # Keep the default watcher
+
+CANCEL_POLL_INTERVAL = 0.2 # Seconds between checks of a cancel event while a command runs
+
+async def run_command_async(argv: List[str], cwd: Optional[str] = None,
+                            cancel: Optional[threading.Event] = None) -> Tuple[str, str, int]:
+    """
+    Async variant of run_command (asyncio subprocess, no shell).
+    If `cancel` gets set (from any thread) while the command runs, the process is terminated.
+    """
+    args = [str(a) for a in argv] # Quoted with shlex.join only when a failure is logged
     try:
-        # Use appropriate encoding, handle potential errors
-        result = subprocess.run(command, shell=True, capture_output=True, text=True, encoding='utf-8', errors='surrogateescape', cwd=cwd)
-        stdout = result.stdout.strip() if result.stdout else ''
-        stderr = result.stderr.strip() if result.stderr else ''
-        if result.returncode != 0:
+        proc = await asyncio.create_subprocess_exec(*args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                                    stderr=subprocess.PIPE, cwd=cwd, limit=PIPE_BUFFER_SIZE)
+        stderr_tail = deque(maxlen=STDERR_TAIL_LINES) # Bounded, like run_command
+        async def drain_stderr():
+            async for line in proc.stderr:
+                stderr_tail.append(line)
+        communicate = asyncio.gather(proc.stdout.read(), drain_stderr())
+        while cancel is not None and not cancel.is_set():
+            done, _ = await asyncio.wait({communicate}, timeout=CANCEL_POLL_INTERVAL)
+            if done: break
+        if cancel is not None and cancel.is_set() and proc.returncode is None:
+            proc.terminate() # Its pipes close, so communicate finishes below
+            await communicate
+            await proc.wait()
+            logger.debug(f"Command cancelled: {shlex.join(args)}")
+            return "", "cancelled", proc.returncode
+        out, _ = await communicate
+        await proc.wait()
+        stdout = out.decode('utf-8', errors='surrogateescape').strip() if out else ''
+        stderr = b"".join(stderr_tail).decode('utf-8', errors='surrogateescape').strip()
+        if proc.returncode != 0:
             stderr_snippet = (stderr[:500] + '...') if len(stderr) > 500 else stderr
-            logger.warning(f"Command failed (Exit Code {result.returncode}): {command}")
+            logger.warning(f"Command failed (Exit Code {proc.returncode}): {shlex.join(args)}")
             if stderr: logger.warning(f"Stderr Snippet: {stderr_snippet}")
-        return stdout, stderr, result.returncode
+        return stdout, stderr, proc.returncode
     except Exception as e:
-        logger.error(f"Exception running command '{command}': {e}")
+        logger.error(f"Exception running command '{shlex.join(args)}': {e}")
         return "", str(e), -1
 
+async def run_command_limited(argv: List[str], semaphore: asyncio.Semaphore,
+                              cancel: Optional[threading.Event] = None) -> Tuple[str, str, int]:
+    """run_command_async, but waits for a slot of the given semaphore so concurrent ffmpegs stay bounded."""
+    async with semaphore:
+        if cancel is not None and cancel.is_set(): # Cancelled while waiting for a slot: don't start it
+            return "", "cancelled", -1
+        return await run_command_async(argv, cancel=cancel)
+
+async def run_commands_async(commands: List[List[str]], max_concurrent: int) -> List[Tuple[str, str, int]]:
+    """Run several commands concurrently (at most max_concurrent at once). Results keep the input order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    return await asyncio.gather(*(run_command_limited(argv, semaphore) for argv in commands))
+
+@lru_cache(maxsize=32)
+def get_font(path: str, size: int):
+    """Load a TrueType font once per (path, size); parsing the font tables is not free."""
+    if not _require_pil(): raise ImportError("Pillow is not available")
+    return ImageFont.truetype(path, size)
+
+@lru_cache(maxsize=1)
+def get_placeholder_font():
+    """PIL's default font at size 10 (older Pillow: its fixed-size bitmap font), loaded once for all placeholders."""
+    if not _require_pil(): raise ImportError("Pillow is not available")
+    try: return ImageFont.load_default(size=10)
+    except TypeError: return ImageFont.load_default()
+
+# Loaded fonts by id(); holding a reference keeps the ids unique so they can key the metric caches below
+_FONTS: Dict[int, Any] = {}
+
+@lru_cache(maxsize=1024)
+def _text_bbox(text: str, font_id: int) -> Tuple[int, int, int, int]:
+    return _FONTS[font_id].getbbox(text)
+
+@lru_cache(maxsize=4096)
+def _text_width(text: str, font_id: int) -> float:
+    font = _FONTS[font_id]
+    if hasattr(font, 'getlength'): return font.getlength(text)
+    bbox = _text_bbox(text, font_id)
+    return bbox[2] - bbox[0]
+
+def text_bbox(font, text: str) -> Tuple[int, int, int, int]:
+    """Memoized font.getbbox(text)."""
+    _FONTS.setdefault(id(font), font)
+    return _text_bbox(text, id(font))
+
+def text_width(font, text: str) -> float:
+    """Memoized advance width of text (font.getlength, or the bbox width on older Pillow)."""
+    if not text: return 0
+    _FONTS.setdefault(id(font), font)
+    return _text_width(text, id(font))
+
+@lru_cache(maxsize=8)
+def _ascii_glyph_widths(font) -> "np.ndarray":
+    """Advance width of every ASCII code point (0 for control characters), measured once per font."""
+    widths = np.zeros(128, dtype=np.float32)
+    for c in range(32, 127):
+        widths[c] = text_width(font, chr(c))
+    return widths
+
+def ascii_text_width(font, text: str) -> float:
+    """
+    Approximate width of ASCII text as the sum of cached per-glyph widths (one vectorized lookup, no kerning).
+    Meant for layout decisions such as wrapping; non-ASCII text is measured exactly.
+    """
+    if not text.isascii():
+        return text_width(font, text)
+    return float(_ascii_glyph_widths(font)[np.frombuffer(text.encode('ascii'), dtype=np.uint8)].sum())
+
+@lru_cache(maxsize=8)
+def _info_text_layout(font, font_size: int, value_column_width: int, line_padding: int) -> Tuple[int, int, int, bool]:
+    """
+    Per-font constants of the info image layout, computed once per (font, width): (row pitch, multiline spacing
+    giving that pitch, characters per value line, legacy getsize metrics). Raises if the font can't be measured.
+    """
+    legacy = not hasattr(font, 'getbbox') # Older PIL/Pillow only has getsize
+    if legacy:
+        single_line_height = font.getsize("Xy")[1] + line_padding
+        measure = lambda text: font.getsize(text)[0]
+    else:
+        test_char_bbox = text_bbox(font, "Xy")
+        single_line_height = test_char_bbox[3] - test_char_bbox[1] + line_padding # Height + padding
+        measure = lambda text: text_width(font, text)
+
+    # multiline_text advances by the height of "A" plus spacing; match the row pitch
+    try: value_spacing = single_line_height - (font.getsize("A")[1] if legacy else text_bbox(font, "A")[3])
+    except Exception: value_spacing = line_padding
+
+    # Character budget per value line from the average glyph width
+    try: avg_char_width = measure(string.ascii_lowercase) / len(string.ascii_lowercase)
+    except Exception: avg_char_width = 0
+    if avg_char_width <= 0: avg_char_width = font_size * 0.6 # Rough fallback
+    return single_line_height, value_spacing, max(1, int(value_column_width / avg_char_width)), legacy
+
+@lru_cache(maxsize=4096)
 def format_duration(seconds: float) -> str:
     """Convert seconds into HH:MM:SS format."""
     try:
-        td = timedelta(seconds=int(round(seconds))) # Round to nearest second
-        hours, remainder = divmod(td.seconds, 3600)
+        hours, remainder = divmod(int(round(seconds)), 3600) # Round to nearest second
         minutes, seconds = divmod(remainder, 60)
-        if td.days > 0:
-            hours += td.days * 24
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     except Exception:
         return "00:00:00"
 
+def _format_ss(seconds: float) -> str:
+    """Convert seconds into the HH:MM:SS.ffffff form used for ffmpeg -ss."""
+    hours, remainder = divmod(int(round(seconds * 1_000_000)), 3_600_000_000)
+    minutes, remainder = divmod(remainder, 60_000_000)
+    secs, micros = divmod(remainder, 1_000_000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{micros:06d}"
+
+def _thumbnail_seek_args(seconds: float) -> List[str]:
+    """Input seek for thumbnail frames: land on the nearest keyframe instead of decoding up to the exact time."""
+    return ["-noaccurate_seek", "-ss", f"{seconds:.3f}"]
+
+# Allow alphanumeric, underscore, hyphen, period. Everything else is replaced with underscore.
+_SANITIZE_RE = re.compile(r'[^\w.\-]+')
+_UNDERSCORE_RUN_RE = re.compile(r'_+')
+
+class _AsciiOnlyTable(dict):
+    """str.translate table dropping every non-ASCII code point; entries are filled in on first sight."""
+    def __missing__(self, codepoint: int):
+        value = None if codepoint > 127 else codepoint
+        self[codepoint] = value
+        return value
+
+_ASCII_ONLY = _AsciiOnlyTable()
+
 def sanitize_filename(filename: str) -> str:
     """Clean filename for filesystem compatibility."""
     try:
@@ -168,15 +443,17 @@ def sanitize_filename(filename: str) -> str:
         if not isinstance(filename, str):
             filename = str(filename)
 
-        # Normalize unicode characters
-        normalized = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        # Normalize unicode characters, then drop what isn't ASCII (combining marks etc.). ASCII input is already NFKD.
+        normalized = filename
+        if not filename.isascii():
+            normalized = unicodedata.normalize('NFKD', filename).translate(_ASCII_ONLY)
 
         # Remove or replace invalid characters
         # Allow alphanumeric, underscore, hyphen, period. Replace others with underscore.
-        sanitized = re.sub(r'[^\w.\-]+', '_', normalized)
+        sanitized = _SANITIZE_RE.sub('_', normalized)
 
         # Remove leading/trailing underscores/periods and excessive consecutive underscores
-        sanitized = re.sub(r'_+', '_', sanitized).strip('_.')
+        sanitized = _UNDERSCORE_RUN_RE.sub('_', sanitized).strip('_.')
 
         # Ensure filename is not empty after sanitization
         return sanitized if sanitized else f"sanitized_{random.randint(1000, 9999)}"
@@ -185,22 +462,143 @@ def sanitize_filename(filename: str) -> str:
         # Provide a safe fallback filename
         return f"sanitized_error_{random.randint(1000, 9999)}"
 
-def get_md5_hash(file_path: Path) -> str:
-    """Calculate MD5 hash of a file."""
-    hash_md5 = hashlib.md5()
+def content_hash_name(use_md5: bool = False) -> str:
+    """Name of the algorithm get_content_hash() will use."""
+    if use_md5: return "MD5"
+    return "BLAKE3" if blake3 is not None else "SHA256"
+
+def get_content_hash(file_path: Path, use_md5: bool = False) -> str:
+    """Calculate a content hash of a file (BLAKE3 if installed, else SHA-256; MD5 if use_md5)."""
+    algorithm = content_hash_name(use_md5)
     try:
+        if algorithm == "BLAKE3":
+            # Memory-mapped and multithreaded inside blake3, no Python read loop
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(str(file_path))
+            return hasher.hexdigest()
+
+        hasher = hashlib.md5() if use_md5 else hashlib.sha256() # sha256 uses SHA-NI where available
         with file_path.open("rb") as f:
-            # Read in larger chunks for potentially better performance
-            for chunk in iter(lambda: f.read(65536), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            size = os.fstat(f.fileno()).st_size
+            # Map the whole file and hash it in one C call (hashlib releases the GIL); RSS is only what gets paged in
+            if 0 < size <= sys.maxsize:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher.update(mm)
+                    return hasher.hexdigest()
+                except (OSError, ValueError, OverflowError) as mmap_e:
+                    logger.debug(f"mmap failed for {file_path.name} ({mmap_e}), falling back to buffered reads.")
+            # Fallback (empty file, no mmap support or too large for the address space): reuse one 4 MiB buffer
+            buf = bytearray(4 * 1024 * 1024)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                hasher.update(view[:n])
+        return hasher.hexdigest()
     except FileNotFoundError:
-        logger.error(f"File not found for MD5 calculation: {file_path}")
+        logger.error(f"File not found for {algorithm} calculation: {file_path}")
         return "N/A (File Not Found)"
     except Exception as e:
-        logger.error(f"Error computing MD5 hash for {file_path.name}: {e}")
+        logger.error(f"Error computing {algorithm} hash for {file_path.name}: {e}")
         return "N/A (Error)"
 
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """One stat() call whose result answers exists/is_file/is_dir/size; None if the path is missing."""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def _file_size(path: Path) -> int:
+    """Size of a regular file from a single stat(), or -1 if it is missing or not a regular file."""
+    st = _stat_or_none(path)
+    return st.st_size if st is not None and stat.S_ISREG(st.st_mode) else -1
+
+@lru_cache(maxsize=1024)
+def _probe_media_cached(path_str: str, size: int, mtime_ns: int) -> Dict[str, Any]:
+    """ffprobe width/height/frame rate/duration of the first video stream. Keyed on (path, size, mtime)."""
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries",
+           "stream=width,height,r_frame_rate:format=duration", "-of", "json", path_str]
+    stdout, _, exit_code = run_command(cmd, text=False)
+    if exit_code != 0:
+        return {}
+    try:
+        data = _json.loads(stdout)
+    except ValueError:
+        return {}
+    stream = (data.get("streams") or [{}])[0]
+    return {"width": stream.get("width"), "height": stream.get("height"),
+            "r_frame_rate": stream.get("r_frame_rate"), "duration": data.get("format", {}).get("duration")}
+
+def probe_media(path: Path) -> Dict[str, Any]:
+    """Cached probe of a media file; re-probed only if the file changed. Empty dict if missing/unreadable."""
+    st = _stat_or_none(path)
+    if st is None:
+        return {}
+    return _probe_media_cached(str(path), st.st_size, st.st_mtime_ns)
+
+def _move_fast(src: Path, dst: Path):
+    """Move a file; a single atomic rename when source and destination are on the same device."""
+    try:
+        same_device = os.stat(src).st_dev == os.stat(dst.parent).st_dev
+    except OSError:
+        same_device = False
+    if same_device:
+        os.replace(src, dst)
+    else:
+        shutil.move(str(src), str(dst)) # Cross-device: copy + delete
+
+# Global ffmpeg option: run -filter_complex graphs (xstack/concat/scale/drawtext...) on all cores. Every filtering
+# command here uses -filter_complex, so -filter_threads (plain -vf chains only; rejected by older builds) is left out.
+FFMPEG_THREADS = os.cpu_count() or 4
+FFMPEG_THREAD_ARGS = ["-filter_complex_threads", str(FFMPEG_THREADS)]
+
+# Hardware H.264 encoders in order of preference: (pix_fmt, fast intermediate args, regular args)
+_HW_H264_ENCODERS = {
+    "h264_nvenc": ("yuv420p", ["-preset", "p1", "-cq"], ["-preset", "p3", "-cq"]),
+    "h264_qsv": ("nv12", ["-preset", "veryfast", "-global_quality"], ["-preset", "faster", "-global_quality"]),
+    "h264_videotoolbox": ("yuv420p", ["-realtime", "1", "-q:v"], ["-q:v"]),
+}
+
+@lru_cache(maxsize=1)
+def detect_h264_encoder() -> Optional[str]:
+    """First hardware H.264 encoder ffmpeg offers that also passes a tiny test encode; None means libx264."""
+    stdout, _, code = run_command(["ffmpeg", "-hide_banner", "-encoders"])
+    if code != 0:
+        return None
+    for name, (pix_fmt, _, _) in _HW_H264_ENCODERS.items():
+        if f" {name} " not in stdout:
+            continue
+        # Being compiled in doesn't mean a device/driver is present
+        test_cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=c=black:s=256x144:d=0.1",
+                    "-c:v", name, "-pix_fmt", pix_fmt, "-f", "null", "-"]
+        if run_command(test_cmd)[2] == 0:
+            logger.info(f"Using hardware H.264 encoder: {name}")
+            return name
+    logger.debug("No usable hardware H.264 encoder found. Using libx264.")
+    return None
+
+def _as_rgb(img: "Image.Image") -> "Image.Image":
+    """The image in RGB mode; convert() always allocates a copy, so RGB images are returned as they are."""
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+@lru_cache(maxsize=32)
+def _xstack_layout(columns: int, rows: int, cell_w: int, cell_h: int) -> str:
+    """
+    xstack layout placing columns x rows cells of cell_w x cell_h in row-major order (pixel offsets).
+    Cached: a batch of videos typically shares one grid shape and segment size.
+    """
+    return "|".join(f"{c * cell_w}_{r * cell_h}" for r in range(rows) for c in range(columns))
+
+def _ram_temp_root(required_bytes: int) -> Optional[Path]:
+    """RAM-backed directory for intermediate files (/dev/shm) if present, writable and with enough room."""
+    shm = Path("/dev/shm")
+    try:
+        if shm.is_dir() and os.access(shm, os.W_OK) and shutil.disk_usage(shm).free > required_bytes:
+            return shm
+    except OSError:
+        pass
+    return None
+
 # --- Core Processing Class ---
 class VideoProcessor:
     def __init__(self, video_path: Path, config: Config):
@@ -217,13 +615,27 @@ class VideoProcessor:
         self.output_dir = base_output_dir / self.base_filename
         # The temporary directory within the specific output directory
         self.temp_dir = self.output_dir / f"{self.base_filename}-temp"
+        if config.USE_TMPFS and not config.KEEP_TEMP_FILES:
+            # Intermediates are consumed right away: keep them off the disk. Budget ~10 MB per segment and ts_ variant.
+            ram_root = _ram_temp_root(config.NUM_OF_SEGMENTS * 2 * 10 * 1024 * 1024 + 64 * 1024 * 1024)
+            if ram_root:
+                self.temp_dir = ram_root / f"preview-{self.base_filename}-{uuid.uuid4().hex[:8]}"
 
         self.metadata: Dict[str, Any] = {}
+        self.probe_data: Dict[str, Any] = {} # Parsed ffprobe JSON of the source video
+        self.keyframe_times: Optional[List[float]] = None # Source keyframes near the cut points (sorted), probed once
         self.cut_points_sec: List[float] = []
+        self.cancel_segments = threading.Event() # Set when cut points are rejected while segments are being generated
         self.segment_files: List[Path] = []
         self.timestamped_segment_files: List[Path] = []
         self.segment_frame_files: List[Path] = []
+        self.segment_frame_images: List["Image.Image"] = [] # Frames decoded straight from an rgb24 pipe (no PNGs)
         self.is_vertical = False
+        # Per-video constants derived once after probing (_set_derived_constants); landscape defaults until then
+        self.is_landscape_effective = True # Landscape, or vertical padded to landscape (ADD_BLACK_BARS)
+        self.segment_dims: Tuple[int, int] = (480, 270) # Width and height of every generated segment
+        self.fps_str = "24.00" # Source FPS as passed to ffmpeg rate options
+        self.segment_duration_str = f"{config.SEGMENT_DURATION:.3f}"
 
     def _check_existing_outputs(self) -> bool:
         """
@@ -232,94 +644,87 @@ class VideoProcessor:
         """
         logger.debug(f"Checking existing outputs in: {self.output_dir}")
         img_sheet_suffix = f".{self.config.IMAGE_SHEET_FORMAT.lower()}"
-        # Define expected output files based on configuration
+        # Define expected output files based on configuration (only the enabled ones matter)
         output_files_config = {
             "WebP Preview": (self.output_dir / f"{self.base_filename}_preview.webp", self.config.CREATE_WEBP_PREVIEW),
             "WebP Sheet": (self.output_dir / f"{self.base_filename}_preview_sheet.webp", self.config.CREATE_WEBP_PREVIEW_SHEET),
             "Image Sheet": (self.output_dir / f"{self.base_filename}_preview_sheet{img_sheet_suffix}", self.config.CREATE_IMAGE_PREVIEW_SHEET),
-            # Check for the *original* video file name within the target output directory
-            "Original Video (Moved)": (self.output_dir / self.original_video_path.name, True) # Original video should always end up here if processing runs
         }
+        generated_outputs = [(name, file_path) for name, (file_path, create_flag) in output_files_config.items() if create_flag]
 
-        required_files_exist = []
-        required_files_missing = []
-        files_to_potentially_delete = [] # Track generated previews/sheets for potential deletion
-
-        original_video_in_target = False
-
-        for name, (file_path, create_flag) in output_files_config.items():
-            is_original_video_check = (name == "Original Video (Moved)")
-
-            if file_path.exists():
-                if is_original_video_check:
-                    original_video_in_target = True
-                    # If original video is found in target, update self.video_path now
-                    self.video_path = file_path
-                    logger.debug(f"  Found existing original video in target: {file_path.name}")
-                # Only consider generated files for 'required existing' check if create_flag is True
-                elif create_flag:
-                    logger.debug(f"  Found existing generated file: {file_path.name}")
-                    required_files_exist.append(name)
-                    files_to_potentially_delete.append((name, file_path))
-            else:
-                # Note missing generated files if create_flag is True
-                if create_flag and not is_original_video_check:
-                    logger.debug(f"  Missing required generated file: {file_path.name}")
-                    required_files_missing.append(name)
-                elif is_original_video_check:
-                    logger.debug(f"  Original video not found in target directory: {file_path.name}")
-                    # If original is missing from target, ensure self.video_path points to original location
-                    if self.video_path != self.original_video_path:
-                        logger.debug(f"  Resetting video_path to original: {self.original_video_path}")
-                        self.video_path = self.original_video_path
+        # One directory read instead of a stat per candidate (the directory may not exist yet)
+        try:
+            with os.scandir(self.output_dir) as entries:
+                existing_names = {entry.name for entry in entries}
+        except (FileNotFoundError, NotADirectoryError):
+            existing_names = set()
 
+        # Check for the *original* video file name within the target output directory
+        # (the original video should always end up here if processing runs)
+        target_video_path = self.output_dir / self.original_video_path.name
+        original_video_in_target = target_video_path.name in existing_names
+        if original_video_in_target:
+            # If original video is found in target, update self.video_path now
+            self.video_path = target_video_path
+            logger.debug(f"  Found existing original video in target: {target_video_path.name}")
+        else:
+            logger.debug(f"  Original video not found in target directory: {target_video_path.name}")
+            # If original is missing from target, ensure self.video_path points to original location
+            if self.video_path != self.original_video_path:
+                logger.debug(f"  Resetting video_path to original: {self.original_video_path}")
+                self.video_path = self.original_video_path
 
         # --- Decide whether to process ---
-        all_required_generated_exist = not required_files_missing
-
-        # Scenario 1: All generated outputs exist AND original video is in target dir
-        if all_required_generated_exist and original_video_in_target and not self.config.IGNORE_EXISTING:
-            logger.info(f"All required outputs and original video exist for '{self.base_filename}' in '{self.output_dir}'. IGNORE_EXISTING is False. Skipping.")
-            return False # Skip processing
-
-        # Scenario 2: IGNORE_EXISTING is True - always proceed, but delete existing generated files first
+        # Scenario 1: IGNORE_EXISTING is True - always proceed, but delete existing generated files first.
+        # No existence probe needed: unlink simply reports files that aren't there.
         if self.config.IGNORE_EXISTING:
-            if files_to_potentially_delete:
-                 logger.info(f"IGNORE_EXISTING is True. Deleting existing generated output files for '{self.base_filename}'...")
-                 for name, file_path in files_to_potentially_delete:
-                     logger.info(f"  Deleting: {file_path.name}")
-                     try: file_path.unlink()
-                     except OSError as e: logger.error(f"  Failed to delete {file_path.name}: {e}") # Log error but continue
-                     sleep(0.05)
+            deleted = []
+            for name, file_path in generated_outputs:
+                try:
+                    file_path.unlink()
+                    deleted.append(file_path.name)
+                except FileNotFoundError: pass
+                except OSError as e: logger.error(f"  Failed to delete {file_path.name}: {e}") # Log error but continue
+            if deleted:
+                logger.info(f"IGNORE_EXISTING is True. Deleted {len(deleted)} existing output file(s) for '{self.base_filename}': {', '.join(deleted)}")
             logger.debug("IGNORE_EXISTING is True. Proceeding with generation.")
             return True # Proceed with processing
 
-        # Scenario 3: Some generated files missing OR original video not in target (and IGNORE_EXISTING is False)
-        if not all_required_generated_exist or not original_video_in_target:
-            # If some generated files exist but others are missing (and IGNORE_EXISTING is False), prompt user
-            if files_to_potentially_delete:
-                logger.warning(f"Some generated outputs missing, but others exist for '{self.base_filename}'.")
-                for name, file_path in files_to_potentially_delete:
-                    try:
-                        choice = input(f"  Existing '{name}' found: '{file_path.name}'. Delete before regenerating? (yes/no): ").strip().lower()
-                    except EOFError:
-                        logger.warning("  Cannot prompt for input (EOFError). Skipping regeneration for safety.")
-                        return False # Skip processing if prompt fails
-                    if choice in ["yes", "y"]:
-                        logger.info(f"  Deleting: {file_path.name}")
-                        try: file_path.unlink()
-                        except OSError as e: logger.error(f"  Failed to delete {file_path.name}: {e}"); return False # Fail if deletion fails
-                    else:
-                        logger.warning(f"  User chose not to delete '{file_path.name}'. Skipping regeneration for '{self.base_filename}'.")
-                        return False # Skip processing if user refuses deletion
-                    sleep(0.05)
-            # If we reach here, either no existing generated files needed deletion, or user approved deletion.
-            logger.debug("Proceeding with generation (files missing or original not moved yet, and IGNORE_EXISTING is False).")
-            return True # Proceed with processing
+        files_to_potentially_delete = [] # Track generated previews/sheets for potential deletion
+        required_files_missing = []
+        for name, file_path in generated_outputs:
+            if file_path.name in existing_names:
+                logger.debug(f"  Found existing generated file: {file_path.name}")
+                files_to_potentially_delete.append((name, file_path))
+            else:
+                logger.debug(f"  Missing required generated file: {file_path.name}")
+                required_files_missing.append(name)
 
-        # Should not be reached, but default to skip for safety
-        logger.warning("Unexpected state in _check_existing_outputs. Skipping generation.")
-        return False
+        # Scenario 2: All generated outputs exist AND original video is in target dir
+        if not required_files_missing and original_video_in_target:
+            logger.info(f"All required outputs and original video exist for '{self.base_filename}' in '{self.output_dir}'. IGNORE_EXISTING is False. Skipping.")
+            return False # Skip processing
+
+        # Scenario 3: Some generated files missing OR original video not in target (and IGNORE_EXISTING is False)
+        # If some generated files exist but others are missing, prompt user
+        if files_to_potentially_delete:
+            logger.warning(f"Some generated outputs missing, but others exist for '{self.base_filename}'.")
+            for name, file_path in files_to_potentially_delete:
+                try:
+                    choice = input(f"  Existing '{name}' found: '{file_path.name}'. Delete before regenerating? (yes/no): ").strip().lower()
+                except EOFError:
+                    logger.warning("  Cannot prompt for input (EOFError). Skipping regeneration for safety.")
+                    return False # Skip processing if prompt fails
+                if choice in ["yes", "y"]:
+                    logger.info(f"  Deleting: {file_path.name}")
+                    try: file_path.unlink()
+                    except OSError as e: logger.error(f"  Failed to delete {file_path.name}: {e}"); return False # Fail if deletion fails
+                else:
+                    logger.warning(f"  User chose not to delete '{file_path.name}'. Skipping regeneration for '{self.base_filename}'.")
+                    return False # Skip processing if user refuses deletion
+        # If we reach here, either no existing generated files needed deletion, or user approved deletion.
+        logger.debug("Proceeding with generation (files missing or original not moved yet, and IGNORE_EXISTING is False).")
+        return True # Proceed with processing
 
     def run(self):
         """Main processing workflow for the video."""
@@ -340,14 +745,18 @@ class VideoProcessor:
 
         logger.info(f"--- Processing: {self.original_video_path.name} ---") # Use original name for initial logging
         logger.info(f"Target output directory: {self.output_dir}")
-        sleep(0.2)
 
         # --- MOVE ORIGINAL VIDEO FILE (if not already there) ---
         target_video_path = self.output_dir / self.original_video_path.name
-        if self.video_path.resolve() != target_video_path.resolve():
+        # samefile compares (st_dev, st_ino) from two stats instead of walking both paths with realpath
+        try:
+            already_in_target = os.path.samefile(self.video_path, target_video_path)
+        except OSError: # Target doesn't exist (yet)
+            already_in_target = False
+        if not already_in_target:
             logger.info(f"Moving video file to output directory: {target_video_path}")
             try:
-                shutil.move(str(self.video_path), str(target_video_path))
+                _move_fast(self.video_path, target_video_path)
                 self.video_path = target_video_path # IMPORTANT: Update the path attribute used by subsequent steps
                 logger.success("Video file moved successfully.")
             except Exception as move_e:
@@ -359,16 +768,6 @@ class VideoProcessor:
         else:
             logger.debug("Video file is already in the target output directory.")
 
-        # --- Create Temp Directory ---
-        # Do this *after* moving the video, within the final output directory
-        try:
-             self.temp_dir.mkdir(parents=True, exist_ok=True)
-             logger.debug(f"Ensured temporary directory exists: {self.temp_dir}")
-        except Exception as e:
-             logger.error(f"Failed to create temporary directory {self.temp_dir}: {e}. Aborting processing for this file.")
-             return False
-
-
         # --- Proceed with Processing using the (potentially updated) self.video_path ---
         if not self._get_metadata():
             logger.error(f"Failed to get metadata for {self.video_path.name}. Aborting processing.")
@@ -382,18 +781,42 @@ class VideoProcessor:
 
         processing_successful = False
         try:
-            # Create output subdirectories inside the main try block
-            # (Already created output_dir and temp_dir)
+            # --- Create Temp Directory ---
+            # Inside the try (after moving the video and the early checks) so the finally always removes it again:
+            # it may live in RAM (/dev/shm) under a unique name
+            try:
+                 self.temp_dir.mkdir(parents=True, exist_ok=True)
+                 logger.debug(f"Ensured temporary directory exists: {self.temp_dir}")
+            except Exception as e:
+                 logger.error(f"Failed to create temporary directory {self.temp_dir}: {e}. Aborting processing for this file.")
+                 return False
 
+            # Also sets self.cut_points_sec (keyframe-snapped seconds)
             cut_points_pct = self._generate_cut_points()
             if not cut_points_pct: return False # Abort if cut points fail
 
-            self.cut_points_sec = [p * video_duration for p in cut_points_pct]
-
-            # Generate segments using the potentially moved video file
-            self.segment_files, self.timestamped_segment_files = self._generate_segments()
+            # Generate segments using the potentially moved video file. Only the sheets need segment files:
+            # the standalone WebP alone is cut straight from the source.
+            needs_segments = self.config.CREATE_WEBP_PREVIEW_SHEET or self.config.CREATE_IMAGE_PREVIEW_SHEET
+            if not needs_segments:
+                if self.config.CONFIRM_CUT_POINTS_REQUIRED and not self._confirm_cut_points(): return False
+            elif self.config.CONFIRM_CUT_POINTS_REQUIRED:
+                # Start extracting while the user reads the cut points; a "no" cancels and discards the segments.
+                # The prompt gets the helper thread: extraction runs asyncio subprocesses, which stay on the main thread.
+                def confirm() -> bool:
+                    if self._confirm_cut_points(): return True
+                    self.cancel_segments.set()
+                    return False
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    confirmed_future = pool.submit(confirm)
+                    segments = self._generate_segments()
+                    confirmed = confirmed_future.result()
+                if not confirmed: return False # Temp folder (and the segments) cleaned up in finally
+                self.segment_files, self.timestamped_segment_files = segments
+            else:
+                self.segment_files, self.timestamped_segment_files = self._generate_segments()
             # Check if segment generation failed (returned empty lists)
-            if not self.segment_files and (self.config.CREATE_WEBP_PREVIEW or self.config.CREATE_WEBP_PREVIEW_SHEET or self.config.CREATE_IMAGE_PREVIEW_SHEET):
+            if not self.segment_files and needs_segments:
                 logger.error("No valid segments generated. Aborting preview generation.")
                 # Temp folder cleanup is handled in finally
                 return False
@@ -407,8 +830,11 @@ class VideoProcessor:
                 results.append(self._generate_webp_preview_sheet())
 
             if self.config.CREATE_IMAGE_PREVIEW_SHEET:
-                 self.segment_frame_files = self._extract_segment_frames()
-                 if self.segment_frame_files:
+                 # Frames go to the sheet in memory; PNG files on disk are only the fallback
+                 self.segment_frame_images = self._extract_segment_frames_to_memory()
+                 if not self.segment_frame_images:
+                      self.segment_frame_files = self._extract_segment_frames()
+                 if self.segment_frame_images or self.segment_frame_files:
                       results.append(self._generate_image_preview_sheet())
                  else:
                       logger.error("Failed to extract frames for image sheet generation.")
@@ -439,7 +865,6 @@ class VideoProcessor:
             if not self.config.KEEP_TEMP_FILES and self.temp_dir.exists():
                  logger.info(f"Removing temporary folder: {self.temp_dir}")
                  shutil.rmtree(self.temp_dir, ignore_errors=True) # Use ignore_errors for robustness
-            sleep(0.1) # Small delay before next file
 
         return processing_successful
 
@@ -451,21 +876,20 @@ class VideoProcessor:
             logger.error(f"Video file not found at expected location for metadata: {self.video_path}")
             return False
         try:
-            # Check for rotation metadata
-            cmd_rot = f'ffprobe -v error -select_streams v:0 -show_entries stream_tags=rotate -of default=nw=1:nk=1 "{self.video_path}"'
-            stdout_rot, _, exit_code_rot = run_command(cmd_rot)
-            if exit_code_rot == 0 and stdout_rot and stdout_rot.strip() not in ["0", ""]:
-                logger.error(f"Video '{self.video_path.name}' has rotation metadata ({stdout_rot.strip()} degrees). Please fix before processing. Skipping.")
-                return False
-
-            # Get format and stream info
-            cmd = f'ffprobe -v error -print_format json -show_format -show_streams "{self.video_path}"'
-            stdout, stderr, exit_code = run_command(cmd)
+            # Get format and stream info (rotation is read from the same JSON below).
+            # Only request the fields used here so ffprobe emits (and we parse) a small JSON.
+            cmd = ["ffprobe", "-v", "error", "-print_format", "json", "-show_entries",
+                   "format=duration,size:format_tags=title:"
+                   "stream=index,codec_type,codec_name,profile,width,height,r_frame_rate,bit_rate,channels:"
+                   "stream_tags=rotate:stream_side_data=side_data_type,rotation",
+                   str(self.video_path)]
+            stdout, stderr, exit_code = run_command(cmd, text=False) # Raw bytes: no decode before parsing
             if exit_code != 0:
                 logger.error(f"ffprobe failed for {self.video_path.name}. Exit Code: {exit_code}. Stderr: {stderr}")
                 return False
 
-            data = json.loads(stdout)
+            data = _json.loads(stdout)
+            self.probe_data = data # Cached for later phases so they don't need to re-run ffprobe on the source
             video_stream = next((s for s in data.get("streams", []) if s.get("codec_type") == "video"), None)
             audio_stream = next((s for s in data.get("streams", []) if s.get("codec_type") == "audio"), None)
             format_info = data.get("format", {})
@@ -474,6 +898,13 @@ class VideoProcessor:
                 logger.error(f"No video stream found for {self.video_path.name}")
                 return False
 
+            # Check for rotation metadata (legacy 'rotate' tag or display matrix side data)
+            rotation = video_stream.get("tags", {}).get("rotate") or next(
+                (sd.get("rotation") for sd in video_stream.get("side_data_list", []) if sd.get("side_data_type") == "Display Matrix"), 0)
+            if str(rotation).strip() not in ["0", "0.0", "", "None"]:
+                logger.error(f"Video '{self.video_path.name}' has rotation metadata ({rotation} degrees). Please fix before processing. Skipping.")
+                return False
+
             # Populate metadata dictionary
             self.metadata["filename"] = self.video_path.name # Use the current name (potentially after move)
             self.metadata["title"] = format_info.get("tags", {}).get("title", "N/A")
@@ -503,6 +934,7 @@ class VideoProcessor:
             except ValueError: self.metadata["fps"] = 0
             self.metadata["video_details"] = (f"{self.metadata['video_codec']} ({self.metadata['video_profile']}) @ "
                                              f"{self.metadata['video_bitrate_kbps']} kbps, {self.metadata['fps']} fps")
+            self._set_derived_constants()
 
             if audio_stream:
                 self.metadata["audio_codec"] = audio_stream.get("codec_name", "N/A").upper()
@@ -515,11 +947,12 @@ class VideoProcessor:
             else:
                 self.metadata["audio_details"] = "No Audio Stream"
 
-            # Calculate MD5 of the file at its *current* location (self.video_path)
-            if self.config.CALCULATE_MD5:
-                 self.metadata["md5"] = get_md5_hash(self.video_path)
+            # Calculate the content hash of the file at its *current* location (self.video_path)
+            self.metadata["hash_algorithm"] = content_hash_name(self.config.USE_MD5)
+            if self.config.CALCULATE_HASH:
+                 self.metadata["content_hash"] = get_content_hash(self.video_path, use_md5=self.config.USE_MD5)
             else:
-                 self.metadata["md5"] = "N/A (Disabled)"
+                 self.metadata["content_hash"] = "N/A (Disabled)"
 
             # Check for specific unsupported codecs
             if self.metadata["video_codec"] == "MSMPEG4V3":
@@ -528,7 +961,7 @@ class VideoProcessor:
 
             logger.info("Metadata extracted successfully.")
             return True
-        except json.JSONDecodeError as e:
+        except json.JSONDecodeError as e: # orjson.JSONDecodeError subclasses it
             logger.error(f"Failed to parse ffprobe JSON output for {self.video_path.name}: {e}")
             return False
         except Exception as e:
@@ -536,7 +969,10 @@ class VideoProcessor:
             return False
 
     def _generate_cut_points(self) -> List[float]:
-        """Generate evenly spaced cut points as percentages."""
+        """
+        Generate evenly spaced cut points as percentages. Their times, snapped back to the source's keyframes,
+        are stored in self.cut_points_sec; those snapped times are what gets printed/confirmed and extracted.
+        """
         # Ensure duration is available
         if not self.metadata.get("duration", 0) > 0:
             logger.error("Video duration unknown or zero, cannot generate cut points.")
@@ -544,130 +980,298 @@ class VideoProcessor:
 
         start_pct = 0.05; end_pct = 0.98
         num_points = self.config.NUM_OF_SEGMENTS
+        blacklist = np.round(np.array(list(self.config.BLACKLISTED_CUT_POINTS), dtype=float), 3)
         valid_points = []
         retries = 2 # Number of attempts to adjust range if points are blacklisted
 
-        while len(valid_points) < num_points and retries > 0:
-            points = set() # Use a set to automatically handle duplicates
-            # Add start/end points if not blacklisted
-            if start_pct not in self.config.BLACKLISTED_CUT_POINTS: points.add(round(start_pct, 3))
-            if end_pct not in self.config.BLACKLISTED_CUT_POINTS: points.add(round(end_pct, 3))
-
-            # Check if start/end points are usable
-            if len(points) < 2 and num_points >= 2:
-                 logger.warning(f"Start/End points ({start_pct:.3f}/{end_pct:.3f}) blacklisted or identical, adjusting range...")
-                 start_pct += 0.01; end_pct -= 0.01
-                 if start_pct >= end_pct:
-                     logger.error("Cannot generate cut points, range collapsed after adjusting for blacklist.")
-                     return []
-                 retries -=1; continue # Retry with adjusted range
-
-            current_start = min(points); current_end = max(points)
-            num_inner_points = num_points - len(points) # Number of points needed between start and end
-
-            if num_inner_points > 0:
-                 if current_end == current_start: # Should not happen if len(points) >= 2 check passed
-                      logger.error("Cannot generate inner points, start and end points are identical after blacklisting.")
-                      return []
-                 # Calculate step for inner points
-                 step = (current_end - current_start) / (num_inner_points + 1)
-                 for i in range(1, num_inner_points + 1):
-                     point = round(current_start + step * i, 3)
-                     # Ensure point is strictly within the bounds to avoid duplicates with start/end
-                     point = max(current_start + 0.001, min(current_end - 0.001, point))
-                     if point not in self.config.BLACKLISTED_CUT_POINTS:
-                         points.add(point)
-
-            # Check if enough unique, non-blacklisted points were generated
-            if len(points) < num_points:
-                logger.warning(f"Could only generate {len(points)}/{num_points} unique non-blacklisted points. Retrying with adjusted range.")
-                start_pct += 0.005; end_pct -= 0.005 # Slightly adjust range for retry
-                if start_pct >= end_pct:
-                    logger.error("Cannot generate required cut points, range collapsed after retries.")
-                    return []
-                retries -= 1; continue # Retry
-
-            # If enough points generated, sort and break the loop
-            valid_points = sorted(list(points))
-            break
+        # Every candidate range (each retry shrinks it by 0.005 on both ends) evaluated in one go:
+        # row r holds the evenly spaced points of attempt r
+        shrink = np.arange(retries + 1) * 0.005
+        starts, ends = start_pct + shrink, end_pct - shrink
+        if not np.all(starts < ends):
+            logger.error("Cannot generate required cut points, range collapsed after retries.")
+            return []
+        grid = np.round(starts[:, None] + (ends - starts)[:, None] * np.linspace(0.0, 1.0, num_points), 3)
+        usable = ~np.isin(grid, blacklist)
+        # Sorted rows: a row is duplicate-free when no neighbours are equal
+        distinct = np.all(np.diff(grid, axis=1) > 0, axis=1) if num_points > 1 else np.ones(len(grid), dtype=bool)
+        ok_rows = np.flatnonzero(usable.all(axis=1) & distinct)
+        if len(ok_rows):
+            if ok_rows[0] > 0:
+                logger.warning(f"Initial cut points hit the blacklist. Using adjusted range (attempt {ok_rows[0] + 1}).")
+            valid_points = grid[ok_rows[0]].tolist()
+        else:
+            # Oversample the full range 4x in one pass, drop blacklisted/duplicate candidates and take an
+            # evenly spread subset of the survivors
+            candidates = np.unique(np.round(np.linspace(start_pct, end_pct, max(num_points * 4, 32)), 3))
+            candidates = candidates[~np.isin(candidates, blacklist)]
+            if len(candidates) >= num_points:
+                logger.warning("Cut points hit the blacklist in every adjusted range. Using oversampled points.")
+                picks = np.unique(np.round(np.linspace(0, len(candidates) - 1, num_points)).astype(int))
+                valid_points = candidates[picks].tolist()
 
         # Final check if required number of points was generated
         if len(valid_points) < num_points:
              logger.error(f"Failed to generate the required {num_points} unique cut points after retries.")
              return []
 
+        # Start every segment on a keyframe: input seeking then needs no decode-and-discard
+        self.cut_points_sec = self._snap_to_keyframes([pct * self.metadata["duration"] for pct in valid_points])
+
         # Log or confirm points if configured
         if self.config.PRINT_CUT_POINTS or self.config.CONFIRM_CUT_POINTS_REQUIRED:
             logger.info("Generated cut points (percentage and time):")
-            for i, pct in enumerate(valid_points):
-                time_sec = pct * self.metadata["duration"]
+            for i, (pct, time_sec) in enumerate(zip(valid_points, self.cut_points_sec)):
                 logger.info(f"  Segment {i+1}: {pct:.3f} ({format_duration(time_sec)})")
 
-        # Require user confirmation if configured
-        if self.config.CONFIRM_CUT_POINTS_REQUIRED:
-            sleep(0.5) # Allow time for user to read points
-            try:
-                confirmation = input("Use these cut points? (yes/no): ").strip().lower()
-            except EOFError: # Handle running in non-interactive environment
-                logger.warning("Cannot prompt for input (EOFError). Assuming NO.")
-                confirmation = "no"
-            if confirmation not in ["yes", "y"]:
-                logger.info("Cut points rejected by user. Aborting processing for this file.")
-                return [] # Return empty list to abort
-
         return valid_points
 
-    def _get_vf_filter(self) -> str:
-        """Determine the FFmpeg -vf filter string based on config."""
+    def _confirm_cut_points(self) -> bool:
+        """Ask the user to accept the printed cut points."""
+        try:
+            confirmation = input("Use these cut points? (yes/no): ").strip().lower()
+        except EOFError: # Handle running in non-interactive environment
+            logger.warning("Cannot prompt for input (EOFError). Assuming NO.")
+            confirmation = "no"
+        if confirmation not in ["yes", "y"]:
+            logger.info("Cut points rejected by user. Aborting processing for this file.")
+            return False
+        return True
+
+    def _get_vf_filter(self, drawtext: Optional[str] = None) -> str:
+        """Determine the FFmpeg -vf filter string based on config, optionally followed by a drawtext filter."""
         target_w, target_h = 480, 270 # Standard 16:9 landscape segment size
         if self.is_vertical:
             if self.config.ADD_BLACK_BARS:
                 # Scale down vertically, then pad horizontally to target WxH
-                return f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color=black"
+                vf_filter = f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color=black"
             else:
                 # Scale vertically to target HxW (swapped for vertical)
-                return f"scale={target_h}:{target_w}"
+                vf_filter = f"scale={target_h}:{target_w}"
         else:
             # Scale landscape to target WxH
-            return f"scale={target_w}:{target_h}"
+            vf_filter = f"scale={target_w}:{target_h}"
+        return f"{vf_filter},{drawtext}" if drawtext else vf_filter
+
+    def _set_derived_constants(self):
+        """Orientation/FPS-derived values the command builders share, computed once per video after probing."""
+        self.is_landscape_effective = not self.is_vertical or self.config.ADD_BLACK_BARS
+        # What _get_vf_filter scales/pads every segment to
+        self.segment_dims = (480, 270) if self.is_landscape_effective else (270, 480)
+        self.fps_str = f"{self.metadata.get('fps') or 24:.2f}"
+
+    def _can_stream_copy(self, font_option: Optional[str]) -> bool:
+        """Segments can be cut with -c copy when nothing has to be drawn or scaled and the codec is H.264/HEVC (into .mkv)."""
+        return (not font_option
+                and (self.metadata.get("width"), self.metadata.get("height")) == self.segment_dims
+                and self.metadata.get("video_codec") in ("H264", "HEVC"))
+
+    def _get_keyframe_times(self, cut_points: List[float]) -> List[float]:
+        """
+        Keyframe timestamps of the source around the cut points (seconds), cached on self.
+        A single ffprobe reads only packet headers (no decoding) in a short window before each cut point.
+        """
+        if self.keyframe_times is not None:
+            return self.keyframe_times
+        window = 10.0 # Seconds before each cut point to look for a keyframe
+        intervals = ",".join(f"{max(0.0, t - window):.3f}%{t + 0.001:.3f}" for t in cut_points)
+        cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-read_intervals", intervals,
+               "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(self.video_path)]
+        stdout, _, exit_code = run_command(cmd)
+        times = set()
+        if exit_code == 0:
+            for line in stdout.splitlines():
+                pts_time, _, flags = line.partition(",")
+                if "K" in flags:
+                    try: times.add(float(pts_time))
+                    except ValueError: pass # pts_time can be N/A
+        self.keyframe_times = sorted(times)
+        logger.debug(f"Found {len(self.keyframe_times)} keyframes near the cut points.")
+        return self.keyframe_times
+
+    def _snap_to_keyframes(self, cut_points: List[float]) -> List[float]:
+        """Move each cut point back to the nearest preceding keyframe so -ss lands on it without decode-and-discard."""
+        keyframes = np.asarray(self._get_keyframe_times(cut_points), dtype=float)
+        if keyframes.size == 0:
+            return cut_points
+        points = np.asarray(cut_points, dtype=float)
+        idx = np.searchsorted(keyframes, points, side='right') - 1
+        snapped = np.where(idx >= 0, keyframes[np.clip(idx, 0, None)], points)
+        # Two cut points must not collapse onto the same keyframe; keep the later one where it was
+        snapped[1:] = np.where(snapped[1:] <= snapped[:-1], points[1:], snapped[1:])
+        return snapped.tolist()
+
+    def _drawtext_font_option(self) -> Optional[str]:
+        """fontfile='...': option for drawtext, escaped for ffmpeg's filtergraph parser. None if the font is missing."""
+        font_path_cfg = self.config.FONT_PATH
+        font_path_obj = Path(font_path_cfg)
 
-    def _verify_segment(self, segment_path: Path) -> bool:
-        """Uses ffprobe to quickly check if a segment file is valid and has duration."""
-        if not segment_path.exists() or segment_path.stat().st_size < 1024: # Basic sanity check
-            logger.warning(f"Segment file is missing or too small: {segment_path.name}")
-            return False
+        # Prepare font path for ffmpeg filtergraph, handling OS differences and escaping
+        try:
+            if not font_path_obj.is_file():
+                logger.error(f"Timestamp overlay font not found at configured path: {font_path_cfg}.")
+                return None
+
+            font_path_resolved = str(font_path_obj.resolve())
+            if sys.platform == "win32":
+                # Windows: Escape backslashes and colons for ffmpeg's filtergraph parser
+                font_path_ffmpeg_val = font_path_resolved.replace("\\", "/").replace(":", "\\\\:")
+            else:
+                # Linux/Mac: Escape single quotes
+                font_path_ffmpeg_val = font_path_resolved.replace("'", "'\\''") # replace ' with '\''
+            font_path_ffmpeg_filter = f"fontfile='{font_path_ffmpeg_val}':"
+            logger.debug(f"Using font filter string: {font_path_ffmpeg_filter}")
+            return font_path_ffmpeg_filter
+        except Exception as e:
+             logger.error(f"Error preparing font path '{font_path_cfg}' for ffmpeg: {e}. Cannot overlay timestamp.")
+             return None
 
-        # Probe for duration
-        cmd_verify = (f'ffprobe -v error -select_streams v:0 -show_entries format=duration '
-                      f'-of default=noprint_wrappers=1:nokey=1 "{segment_path}"')
-        stdout, stderr, exit_code = run_command(cmd_verify)
+    def _drawtext_filter(self, start_sec: float, font_option: str) -> str:
+        """drawtext filter burning the HH:MM:SS start time into the top right corner."""
+        timestamp_text = format_duration(start_sec).replace(":", r"\:") # Escape colons for drawtext
+        return (f"drawtext=text='{timestamp_text}':{font_option}" # Include prepared font path filter
+                "fontcolor=white:fontsize=20:x=(w-text_w)-10:y=10:box=1:boxcolor=black@0.4:boxborderw=5")
 
-        if exit_code != 0:
-            logger.error(f"ffprobe verification failed for {segment_path.name}. Exit Code: {exit_code}, Stderr: {stderr}")
+    async def _verify_segment(self, segment_path: Path) -> bool:
+        """
+        Check that a segment ffmpeg reported as written is usable. A size check by default (exit code 0 already
+        means a complete mux); with STRICT_VERIFY the duration is also probed.
+        """
+        if _file_size(segment_path) < 1024: # Basic sanity check (missing -> -1)
+            logger.warning(f"Segment file is missing or too small: {segment_path.name}")
             return False
-        if not stdout or not stdout.strip():
+        if not self.config.STRICT_VERIFY:
+            return True
+
+        # Probe for duration (cached helper, run off the event loop)
+        duration_str = (await asyncio.to_thread(probe_media, segment_path)).get("duration")
+        if not duration_str:
             logger.error(f"ffprobe could not determine duration for {segment_path.name}. Likely invalid.")
             return False
         try:
-            duration = float(stdout.strip())
+            duration = float(duration_str)
             # Check for non-positive duration, allowing for very small positive values
             if duration <= 0.01:
                 logger.error(f"ffprobe reported non-positive or near-zero duration ({duration}s) for {segment_path.name}.")
                 return False
         except ValueError:
-            logger.error(f"ffprobe returned non-numeric duration '{stdout.strip()}' for {segment_path.name}.")
+            logger.error(f"ffprobe returned non-numeric duration '{duration_str}' for {segment_path.name}.")
             return False
 
         logger.debug(f"Segment verified successfully: {segment_path.name} (Duration: {duration:.2f}s)")
         return True
 
+    def _hw_encoder(self) -> Optional[str]:
+        """Hardware H.264 encoder in use, or None for libx264."""
+        if not self.config.USE_HW_ENCODER or self.config.INTERMEDIATE_CODEC != "h264":
+            return None # FFV1 intermediates: no H.264 encode, so no GPU device (decode) either
+        return self.config.HW_ENCODER
+
+    def _encoder_args(self, fast: bool = False, quality: int = 23) -> List[str]:
+        """
+        H.264 encoder options: the detected hardware encoder, else libx264. Every H.264 file written here is an
+        intermediate that ends up re-encoded to WebP, so even the regular profile trades size for speed (faster
+        instead of medium); `fast` is for short clips (speed over everything). `quality` is the CRF-like target
+        (crf / cq / global_quality).
+        """
+        encoder = self._hw_encoder()
+        if encoder:
+            pix_fmt, fast_args, final_args = _HW_H264_ENCODERS[encoder]
+            quality_value = "65" if encoder == "h264_videotoolbox" else str(quality) # VideoToolbox: 1-100, higher is better
+            return ["-c:v", encoder] + (fast_args if fast else final_args) + [quality_value, "-pix_fmt", pix_fmt, "-threads", "0"]
+        preset = ["-preset", "ultrafast", "-tune", "zerolatency"] if fast else ["-preset", "faster"]
+        return ["-c:v", "libx264", "-crf", str(quality)] + preset + ["-pix_fmt", "yuv420p", "-threads", "0"]
+
+    def _intermediate_codec_args(self) -> List[str]:
+        """
+        Codec of the segment clips, which are only decoded again for the WebP outputs and frame grabs. FFV1 is
+        lossless and every frame is a keyframe (-g 1), so the final encodes see the filtered frames unchanged.
+        """
+        if self.config.INTERMEDIATE_CODEC == "ffv1":
+            return ["-c:v", "ffv1", "-level", "3", "-g", "1", "-threads", "0"]
+        return self._encoder_args(fast=True)
+
+    def _segment_input_args(self, start_time_ss: str, cut_duration: float) -> List[str]:
+        """Seeked input for one segment. -ss/-t before -i give a fast keyframe seek and limit what is read."""
+        hwaccel = ["-hwaccel", "auto"] if self._hw_encoder() else [] # Decode on the GPU too; frames come back for the filters
+        return hwaccel + ["-ss", start_time_ss, "-t", f"{cut_duration:.3f}", "-i", str(self.video_path)]
+
+    def _segment_output_args(self, label: str, segment_path: Path) -> List[str]:
+        """Output options encoding filtergraph output `label` into `segment_path`."""
+        return [
+            "-map", f"[{label}]", # Select this segment's filtered video
+            *self._intermediate_codec_args(), # Intermediate clips: favour encode speed over size
+            "-an", "-sn", "-dn", # No audio, subs, data
+            "-map_metadata", "-1", "-map_chapters", "-1", # Drop metadata/chapters
+            "-y", str(segment_path) # Overwrite output
+        ]
+
+    def _use_single_decode(self, jobs: List[tuple]) -> bool:
+        """
+        True when the jobs lie close enough together that one decode of their span beats a seek per segment:
+        the single pass decodes the whole span in one process, the seeked batches only the cuts themselves
+        (in parallel), so the span may only be a small multiple of the total cut duration.
+        """
+        if len(jobs) < 2:
+            return False
+        span = max(job[1] + job[4] for job in jobs) - min(job[1] for job in jobs)
+        return span <= self.config.SINGLE_DECODE_MAX_SPAN_RATIO * sum(job[4] for job in jobs)
+
+    def _segment_branch(self, k: int, source: str, start_sec: float, font_option: Optional[str],
+                        segment_path: Path, graph_parts: List[str], outputs: List[Tuple[str, Path]]):
+        """Append the scale/pad (+ drawtext) filter chain for segment `k` reading `source` and record its outputs."""
+        mode = self.config.TIMESTAMPS_MODE if font_option else 0
+        if mode == 1:
+            graph_parts.append(f"{source}{self._get_vf_filter(self._drawtext_filter(start_sec, font_option))}[s{k}]")
+        elif mode == 2:
+            graph_parts.append(f"{source}{self._get_vf_filter()},split=2[s{k}][t{k}];"
+                               f"[t{k}]{self._drawtext_filter(start_sec, font_option)}[d{k}]")
+            outputs.append((f"d{k}", segment_path.with_name(f"ts_{segment_path.name}")))
+        else:
+            graph_parts.append(f"{source}{self._get_vf_filter()}[s{k}]")
+        outputs.append((f"s{k}", segment_path))
+
+    def _build_segment_command(self, jobs: List[tuple], font_option: Optional[str]) -> List[str]:
+        """
+        One ffmpeg command extracting every job in `jobs` with one filtergraph doing scale/pad and the timestamp
+        drawtext, so each segment is decoded and encoded exactly once. Segments are either separate seeked
+        inputs or, when they lie close together, trim branches of a single decode of their whole span.
+        TIMESTAMPS_MODE 1 encodes only the timestamped clip; mode 2 splits the scaled stream and writes both
+        the plain segment and its ts_ variant.
+        """
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", *FFMPEG_THREAD_ARGS]
+        if self._can_stream_copy(font_option):
+            # Source already has the segment size: cut at the (snapped) keyframe without re-encoding
+            for job in jobs: cmd += self._segment_input_args(job[3], job[4])
+            for k, job in enumerate(jobs):
+                cmd += ["-map", f"{k}:v:0", "-c", "copy", "-avoid_negative_ts", "make_zero",
+                        "-an", "-sn", "-dn", "-map_metadata", "-1", "-map_chapters", "-1", "-y", str(job[2])]
+            return cmd
+
+        graph_parts, outputs = [], []
+        if self._use_single_decode(jobs):
+            # One seeked input covering every segment; split it and trim each branch (timestamps start at 0)
+            span_start = min(job[1] for job in jobs)
+            span_end = max(job[1] + job[4] for job in jobs)
+            cmd += self._segment_input_args(_format_ss(span_start), span_end - span_start)
+            graph_parts.append(f"[0:v]split={len(jobs)}" + "".join(f"[i{k}]" for k in range(len(jobs))))
+            for k, (_, start_sec, segment_path, _, cut_duration) in enumerate(jobs):
+                trim = f"trim=start={start_sec - span_start:.3f}:duration={cut_duration:.3f},setpts=PTS-STARTPTS,"
+                self._segment_branch(k, f"[i{k}]{trim}", start_sec, font_option, segment_path, graph_parts, outputs)
+        else:
+            for k, (_, start_sec, segment_path, start_time_ss, cut_duration) in enumerate(jobs):
+                cmd += self._segment_input_args(start_time_ss, cut_duration)
+                self._segment_branch(k, f"[{k}:v]", start_sec, font_option, segment_path, graph_parts, outputs)
+        cmd += ["-filter_complex", ";".join(graph_parts)]
+        for label, path in outputs:
+            cmd += self._segment_output_args(label, path)
+        return cmd
+
     def _generate_segments(self) -> Tuple[List[Path], List[Path]]:
         """Generate video segments using ffmpeg from self.video_path and verify them."""
         valid_segment_paths = []
         timestamped_paths_for_sheet = [] # Paths potentially with timestamp overlay
-        vf_filter = self._get_vf_filter()
         total_segments_requested = len(self.cut_points_sec)
-        segments_generated = 0
         max_duration = self.metadata.get("duration", 0)
 
         # Ensure video path exists before starting loop
@@ -675,7 +1279,8 @@ class VideoProcessor:
             logger.error(f"Input video file not found at {self.video_path}. Cannot generate segments.")
             return [], []
 
-
+        # Build every segment job first, then run the ffmpeg extractions concurrently
+        jobs = [] # (segment_index, start_sec, segment_path, start_time_ss, cut_duration)
         for i, start_sec in enumerate(self.cut_points_sec):
             segment_index = i + 1
             logger.debug(f"Processing segment {segment_index}/{total_segments_requested} starting at {start_sec:.3f}s")
@@ -693,68 +1298,35 @@ class VideoProcessor:
                 continue
 
             # Format start time for ffmpeg -ss and filename
-            start_time_td = timedelta(seconds=start_sec)
             # Use precise start time for -ss
-            start_time_ss = f"{int(start_time_td.total_seconds() // 3600):02d}:{int(start_time_td.seconds // 60 % 60):02d}:{int(start_time_td.seconds % 60):02d}.{start_time_td.microseconds:06d}"
+            start_time_ss = _format_ss(start_sec)
             # Use rounded duration for filename
             start_time_fn = format_duration(start_sec).replace(":",".")
 
             # Define segment output path in the temp directory
-            segment_filename = f"{self.base_filename}_start-{start_time_fn}_seg-{segment_index:02d}.mp4" # Added padding
+            segment_filename = f"{self.base_filename}_start-{start_time_fn}_seg-{segment_index:02d}.mkv" # Added padding; mkv holds FFV1 (and stream-copied H.264/HEVC)
             segment_path = self.temp_dir / segment_filename
 
-            # Construct ffmpeg command for segment extraction
-            # Use -ss before -i for faster seeking (but potentially less accurate start frame)
-            # Add -copyts to try and preserve timestamps if needed, but might cause issues; test carefully. Remove if problematic.
-            # Use -map 0:v:0 explicitly selects the first video stream.
-            ffmpeg_cmd = (
-                f'ffmpeg -hide_banner -loglevel error '
-                f'-ss {start_time_ss} -i "{self.video_path}" -t {cut_duration:.3f} ' # -t specifies duration to cut
-                f'-vf "{vf_filter}" ' # Apply scaling/padding filter
-                f'-map 0:v:0 ' # Select video stream
-                f'-c:v libx264 -crf 23 -preset medium ' # Video codec options
-                f'-an -sn -dn ' # No audio, subs, data
-                f'-map_metadata -1 -map_chapters -1 ' # Drop metadata/chapters
-                f'-y "{segment_path}"' # Overwrite output
-            )
-            logger.debug(f"Segment command: {ffmpeg_cmd}")
-            _, stderr, exit_code = run_command(ffmpeg_cmd)
-
-            # Verify the generated segment
-            if exit_code == 0 and self._verify_segment(segment_path):
-                logger.debug(f"Generated and verified segment {segment_index}: {segment_path.name}")
-                segments_generated += 1
-
-                # Determine which path to use for previews/sheets based on timestamp mode
-                final_segment_path_for_preview = segment_path # Used for standalone preview if mode 0 or 2
-                path_for_sheet = segment_path # Used for sheet if mode 0
-
-                # Apply timestamp overlay if required
-                if self.config.TIMESTAMPS_MODE in [1, 2]:
-                    overlay_path = self._overlay_timestamp(segment_path, start_sec)
-                    if overlay_path:
-                        if self.config.TIMESTAMPS_MODE == 1:
-                            final_segment_path_for_preview = overlay_path # Use timestamped for standalone preview
-                            path_for_sheet = overlay_path # Use timestamped for sheet
-                        else: # TIMESTAMPS_MODE == 2
-                            # Standalone preview uses original (final_segment_path_for_preview = segment_path)
-                            path_for_sheet = overlay_path # Sheet uses timestamped
-                    else:
-                        logger.warning(f"Failed timestamp overlay for segment {segment_index}. Using original segment for previews/sheets.")
-                        # Fallback: use original path if overlay failed
-                        path_for_sheet = segment_path
-                        # final_segment_path_for_preview remains segment_path
-
-                valid_segment_paths.append(final_segment_path_for_preview)
-                timestamped_paths_for_sheet.append(path_for_sheet) # Collect paths specifically for sheets
+            jobs.append((segment_index, start_sec, segment_path, start_time_ss, cut_duration))
 
-            else:
-                logger.error(f"Failed to generate or verify segment {segment_index} (Start: {start_sec:.3f}s). ExitCode: {exit_code}.")
-                if stderr: logger.error(f"  FFmpeg stderr: {stderr}")
-                # Attempt cleanup of failed segment file
-                segment_path.unlink(missing_ok=True)
-                ts_path = segment_path.with_name(f"ts_{segment_path.name}")
-                ts_path.unlink(missing_ok=True)
+        # Timestamps are burned in by the extraction itself; without a usable font segments stay plain
+        font_option = None
+        if self.config.TIMESTAMPS_MODE in [1, 2]:
+            font_option = self._drawtext_font_option()
+            if not font_option:
+                logger.warning("Timestamp overlay unavailable. Using original segments for previews/sheets.")
+
+        # Extraction and verification run concurrently; results keep cut point order
+        _use_pidfd_child_watcher() # Main thread only (see run(): the confirmation prompt gets the helper thread)
+        outcomes = asyncio.run(self._process_segments(jobs, font_option))
+        if self.cancel_segments.is_set():
+            logger.debug("Segment generation cancelled.")
+            return [], []
+        for preview_path, sheet_path in outcomes:
+            if preview_path:
+                valid_segment_paths.append(preview_path)
+                timestamped_paths_for_sheet.append(sheet_path) # Collect paths specifically for sheets
+        segments_generated = len(valid_segment_paths)
 
         logger.info(f"Finished segment generation. Successfully generated {segments_generated}/{total_segments_requested} segments.")
         # If no segments were successfully generated but some were requested, it's a failure state
@@ -764,137 +1336,135 @@ class VideoProcessor:
 
         return valid_segment_paths, timestamped_paths_for_sheet
 
-    def _overlay_timestamp(self, segment_path: Path, start_sec: float) -> Optional[Path]:
-        """Overlays HH:MM:SS timestamp onto a segment."""
-        timestamp_text = format_duration(start_sec).replace(":", r"\:") # Escape colons for drawtext
-        output_path = segment_path.with_name(f"ts_{segment_path.stem}{segment_path.suffix}") # ts_basename.mp4
-
-        font_path_cfg = self.config.FONT_PATH
-        font_path_obj = Path(font_path_cfg)
-
-        # Prepare font path for ffmpeg filtergraph, handling OS differences and escaping
-        try:
-            if not font_path_obj.is_file():
-                logger.error(f"Timestamp overlay font not found at configured path: {font_path_cfg}.")
-                return None
-
-            font_path_resolved = str(font_path_obj.resolve())
-            if sys.platform == "win32":
-                # Windows: Escape backslashes and colons for ffmpeg's filtergraph parser
-                font_path_ffmpeg_val = font_path_resolved.replace("\\", "/").replace(":", "\\\\:")
-            else:
-                # Linux/Mac: Escape single quotes
-                font_path_ffmpeg_val = font_path_resolved.replace("'", "'\\''") # replace ' with '\''
-            font_path_ffmpeg_filter = f"fontfile='{font_path_ffmpeg_val}':"
-            logger.debug(f"Using font filter string: {font_path_ffmpeg_filter}")
-        except Exception as e:
-             logger.error(f"Error preparing font path '{font_path_cfg}' for ffmpeg: {e}. Cannot overlay timestamp.")
-             return None
-
-        # Construct the ffmpeg command with drawtext filter
-        ffmpeg_cmd = (
-            f'ffmpeg -hide_banner -loglevel error -i "{segment_path}" '
-            f'-vf "drawtext=text=\'{timestamp_text}\':{font_path_ffmpeg_filter}' # Include prepared font path filter
-            f'fontcolor=white:fontsize=20:x=(w-text_w)-10:y=10:box=1:boxcolor=black@0.4:boxborderw=5" '
-            f'-c:v libx264 -crf 23 -preset medium -an -y "{output_path}"' # Encode the output
-        )
-        logger.debug(f"Timestamp overlay command: {ffmpeg_cmd}")
-        _, stderr, exit_code = run_command(ffmpeg_cmd)
-
-        if exit_code == 0 and output_path.exists():
-            logger.debug(f"Timestamp overlay successful: {output_path.name}")
-            return output_path
-        else:
-            logger.error(f"Failed timestamp overlay on {segment_path.name}. ExitCode: {exit_code}")
+    async def _process_segments(self, jobs: List[tuple], font_option: Optional[str]) -> List[Tuple[Optional[Path], Optional[Path]]]:
+        """Run the segment jobs; every ffmpeg/ffprobe goes through one semaphore (MAX_CONCURRENT_FFMPEG)."""
+        semaphore = asyncio.Semaphore(max(1, self.config.MAX_CONCURRENT_FFMPEG))
+
+        # Batch the segments into a few ffmpeg processes: each segment is its own seeked input -> output pair,
+        # so every process pays startup/container init once for several segments. Jobs are interleaved so
+        # batches get similar work.
+        # Close-together cut points (short videos) are all trimmed from a single decode pass instead.
+        num_batches = 1 if self._use_single_decode(jobs) else max(1, min(self.config.MAX_CONCURRENT_FFMPEG, len(jobs)))
+        batches = [jobs[b::num_batches] for b in range(num_batches) if jobs[b::num_batches]]
+        batch_cmds = []
+        for batch in batches:
+            cmd = self._build_segment_command(batch, font_option)
+            logger.debug(f"Segment batch command ({len(batch)} segments): {cmd}")
+            batch_cmds.append(cmd)
+        # A "no" at the cut point prompt (run() on the helper thread) terminates the running batches
+        batch_results = await asyncio.gather(*(run_command_limited(cmd, semaphore, self.cancel_segments) for cmd in batch_cmds))
+        if self.cancel_segments.is_set(): # Rejected meanwhile: skip verification and retries
+            return [(None, None)] * len(jobs)
+
+        batch_exit_codes = {} # segment_index -> exit code of the batch that produced it
+        for batch, (_, _, exit_code) in zip(batches, batch_results):
+            for job in batch:
+                batch_exit_codes[job[0]] = exit_code
+
+        # Re-extract everything the batches didn't deliver in one more shared process; only what still fails
+        # after that falls back to one ffmpeg per segment (in _finish_segment)
+        async def delivered_ok(job: tuple) -> bool:
+            return batch_exit_codes[job[0]] == 0 and await self._verify_segment(job[2])
+        delivered = await asyncio.gather(*(delivered_ok(job) for job in jobs))
+        failed = [job for job, ok in zip(jobs, delivered) if not ok]
+        if len(failed) > 1:
+            logger.warning(f"{len(failed)} segments failed in batched extraction. Retrying them together.")
+            _, _, retry_code = await run_command_limited(self._build_segment_command(failed, font_option), semaphore)
+            for job in failed:
+                batch_exit_codes[job[0]] = retry_code
+
+        return await asyncio.gather(*(self._finish_segment(job, batch_exit_codes[job[0]], font_option, semaphore) for job in jobs))
+
+    async def _finish_segment(self, job: tuple, batch_exit_code: int, font_option: Optional[str],
+                              semaphore: asyncio.Semaphore) -> Tuple[Optional[Path], Optional[Path]]:
+        """Verify one segment (re-extracting it alone if needed). Returns (preview, sheet) paths."""
+        segment_index, start_sec, segment_path, start_time_ss, cut_duration = job
+        ts_path = segment_path.with_name(f"ts_{segment_path.name}") # Written alongside in TIMESTAMPS_MODE 2
+        exit_code, stderr = batch_exit_code, ""
+        verified = exit_code == 0 and await self._verify_segment(segment_path)
+
+        # Fall back to one ffmpeg for this segment if the batched run didn't produce it
+        if not verified and not self.cancel_segments.is_set():
+            logger.warning(f"Segment {segment_index} failed in batched extraction. Retrying it individually.")
+            retry_cmd = self._build_segment_command([job], font_option)
+            _, stderr, exit_code = await run_command_limited(retry_cmd, semaphore)
+            verified = exit_code == 0 and await self._verify_segment(segment_path)
+            if not verified and font_option:
+                # The drawtext branch may be what failed: keep the segment without a timestamp
+                logger.warning(f"Failed timestamp overlay for segment {segment_index}. Retrying without timestamp.")
+                font_option = None
+                _, stderr, exit_code = await run_command_limited(self._build_segment_command([job], None), semaphore)
+                verified = exit_code == 0 and await self._verify_segment(segment_path)
+
+        if not verified:
+            logger.error(f"Failed to generate or verify segment {segment_index} (Start: {start_sec:.3f}s). ExitCode: {exit_code}.")
             if stderr: logger.error(f"  FFmpeg stderr: {stderr}")
-            output_path.unlink(missing_ok=True) # Clean up failed output
-            return None
-
-    def _write_concat_file(self, segment_paths: List[Path], output_filename: str) -> Optional[Path]:
-        """Writes a concat list file needed by ffmpeg's concat demuxer."""
-        if not segment_paths:
-            logger.error("No segment paths provided to write concat file.")
-            return None
-
-        concat_path = self.temp_dir / output_filename
-        try:
-            with concat_path.open("w", encoding='utf-8') as f:
-                for path in segment_paths:
-                    # Ensure the path is absolute and uses POSIX separators for ffmpeg
-                    safe_path = path.resolve().as_posix()
-                    # Escape single quotes within the path itself for safety
-                    safe_path_escaped = safe_path.replace("'", "'\\''") # replace ' with '\''
-                    f.write(f"file '{safe_path_escaped}'\n")
-            logger.debug(f"Concat file written: {concat_path}")
-            return concat_path
-        except Exception as e:
-            logger.error(f"Failed to write concat file '{concat_path}': {e}")
-            return None
-
-    def _run_ffmpeg_concat(self, concat_file_path: Path, output_video_path: Path) -> bool:
-        """Runs ffmpeg -f concat demuxer to join segments without re-encoding."""
-        if not concat_file_path or not concat_file_path.exists():
-            logger.error(f"Concat file not found or not specified: {concat_file_path}")
-            return False
-
-        # Command to concatenate using the list file
-        # -safe 0 allows using absolute paths in the concat file
-        # -c copy stream copies without re-encoding (fast, preserves quality)
-        concat_cmd = (f'ffmpeg -hide_banner -loglevel error -f concat -safe 0 '
-                      f'-i "{concat_file_path}" -c copy -y "{output_video_path}"')
-
-        logger.debug(f"Running concat command: {concat_cmd}")
-        _, stderr, exit_code = run_command(concat_cmd)
-
-        if exit_code != 0 or not output_video_path.exists() or output_video_path.stat().st_size == 0:
-            logger.error(f"Concatenation failed for '{concat_file_path.name}'. Exit Code: {exit_code}")
-            if stderr: logger.error(f"  FFmpeg stderr: {stderr}")
-            output_video_path.unlink(missing_ok=True) # Clean up failed output
-            return False
+            # Attempt cleanup of failed segment file
+            segment_path.unlink(missing_ok=True)
+            ts_path.unlink(missing_ok=True)
+            return None, None
+
+        logger.debug(f"Generated and verified segment {segment_index}: {segment_path.name}")
+
+        # Mode 0 and 1: one clip serves both previews and sheets (in mode 1 it already carries the timestamp).
+        # Mode 2: standalone preview uses the plain segment, the sheet uses the timestamped ts_ variant.
+        path_for_sheet = segment_path
+        if font_option and self.config.TIMESTAMPS_MODE == 2:
+            if _file_size(ts_path) >= 1024:
+                path_for_sheet = ts_path
+            else:
+                logger.warning(f"Failed timestamp overlay for segment {segment_index}. Using original segment for previews/sheets.")
 
-        logger.debug(f"Concatenation successful: {output_video_path.name}")
-        return True
+        return segment_path, path_for_sheet
 
     def _generate_webp_preview(self) -> bool:
         """Generates the standalone animated WebP preview."""
         logger.info("Generating standalone animated WebP preview...")
         # Use segments intended for preview (may or may not have timestamps based on mode)
         segments_for_preview = self.segment_files
-        if not segments_for_preview:
+        graph_parts, concat_inputs = [], ""
+        if segments_for_preview:
+            webp_inputs = [arg for segment in segments_for_preview for arg in ("-i", str(segment))]
+            n = len(segments_for_preview)
+            concat_inputs = "".join(f"[{i}:v]" for i in range(n))
+        else:
+            # No segments were extracted (no sheets requested): cut the clips from the source in this same ffmpeg
+            font_option = self._drawtext_font_option() if self.config.TIMESTAMPS_MODE == 1 else None
+            max_duration = self.metadata.get("duration", 0)
+            webp_inputs = []
+            for start_sec in self.cut_points_sec:
+                cut_duration = min(self.config.SEGMENT_DURATION, max_duration - start_sec)
+                if cut_duration <= 0.01: continue
+                k = len(graph_parts)
+                webp_inputs += self._segment_input_args(_format_ss(start_sec), cut_duration)
+                drawtext = self._drawtext_filter(start_sec, font_option) if font_option else None
+                graph_parts.append(f"[{k}:v]{self._get_vf_filter(drawtext)}[p{k}]")
+                concat_inputs += f"[p{k}]"
+            n = len(graph_parts)
+        if not n:
             logger.error("No valid segments available for WebP preview.")
             return False
 
-        # Create the concat list file
-        concat_file = self._write_concat_file(segments_for_preview, "concat_list_webp_preview.txt")
-        if not concat_file: return False # Fail if concat file writing fails
-
-        # Define the intermediate concatenated video path
-        concat_video = self.temp_dir / f"{self.base_filename}_concat_webp_preview.mp4"
-
-        # Run ffmpeg concat
-        if not self._run_ffmpeg_concat(concat_file, concat_video):
-            logger.error("Failed to concatenate segments for WebP preview.")
-            return False # Fail if concatenation fails
-
         # Define the final output WebP path
         output_webp = self.output_dir / f"{self.base_filename}_preview.webp"
         # Determine scaling based on aspect ratio
-        scale_filter = "scale=480:-2" if not self.is_vertical or self.config.ADD_BLACK_BARS else "scale=-2:480"
-
-        # Construct the ffmpeg command to convert concatenated video to WebP
-        webp_cmd = (f'ffmpeg -hide_banner -loglevel error -y '
-                    f'-i "{concat_video}" ' # Input concatenated video
-                    f'-vf "fps=24,{scale_filter}:flags=lanczos" ' # Set FPS, scale, use Lanczos filter
-                    f'-c:v libwebp -quality 80 -compression_level 6 ' # WebP codec options
-                    f'-loop 0 ' # Loop infinitely
-                    f'-an ' # No audio
-                    f'-vsync 0 ' # Video sync method
-                    f'"{output_webp}"')
+        scale_filter = "scale=480:-2" if self.is_landscape_effective else "scale=-2:480"
+
+        # Concatenate, resample and scale the segments in one filter graph and encode
+        # straight to WebP, so no intermediate concat file or video is written
+        graph_parts.append(f"{concat_inputs}concat=n={n}:v=1:a=0[c];[c]fps=24,{scale_filter}:flags=lanczos[o]")
+        webp_cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *FFMPEG_THREAD_ARGS, *webp_inputs]
+        webp_cmd += ["-filter_complex", ";".join(graph_parts), "-map", "[o]",
+                     "-c:v", "libwebp", "-quality", "80", "-compression_level", "6", "-threads", "0", # WebP codec options
+                     "-loop", "0", # Loop infinitely
+                     "-an", # No audio
+                     "-vsync", "0", # Video sync method
+                     str(output_webp)]
 
         logger.debug(f"WebP generation command: {webp_cmd}")
         _, stderr, code = run_command(webp_cmd)
 
-        if code == 0 and output_webp.exists() and output_webp.stat().st_size > 0:
+        if code == 0 and _file_size(output_webp) > 0:
             logger.success(f"Standalone WebP preview created: {output_webp.name}")
             return True
         else:
@@ -906,6 +1476,9 @@ class VideoProcessor:
     def _create_info_image(self) -> Optional[Path]:
         """Creates the metadata image for the sheet header."""
         logger.debug("Creating info image header...")
+        if not _require_pil():
+            logger.error("Pillow is required for the info image header.")
+            return None
 
         # Image and Font settings
         font_size = 16
@@ -919,17 +1492,17 @@ class VideoProcessor:
         if self.config.GRID_WIDTH == 3:
             # 3 segments wide. If vertical segments (270px wide each), width is 3*270=810.
             # If landscape segments (480px wide each), width is 3*480=1440.
-            img_width = 810 if self.is_vertical and not self.config.ADD_BLACK_BARS else 1440
+            img_width = 1440 if self.is_landscape_effective else 810
         elif self.config.GRID_WIDTH == 4:
             # 4 segments wide. Vertical: 4*270=1080. Landscape: 4*480=1920.
-            img_width = 1080 if self.is_vertical and not self.config.ADD_BLACK_BARS else 1920
+            img_width = 1920 if self.is_landscape_effective else 1080
         else:
             logger.error(f"Unsupported GRID_WIDTH ({self.config.GRID_WIDTH}) for info image generation.")
             return None
 
         # Load font
         try:
-            font = ImageFont.truetype(self.config.FONT_PATH, font_size)
+            font = get_font(self.config.FONT_PATH, font_size)
         except IOError:
             logger.warning(f"Font '{self.config.FONT_PATH}' not found or failed to load. Using PIL default.")
             try: font = ImageFont.load_default(size=font_size) # Newer Pillow might need size
@@ -945,23 +1518,17 @@ class VideoProcessor:
             logger.error("Calculated value column width is zero or negative. Check image width and margins.")
             return None
 
-        # Get text metrics (height, width calculation function) using the loaded font
+        # Text metrics and the wrap budget are constant per font and width (cached across videos)
         try:
-             # Use getbbox for more accurate sizing if available (Pillow >= 8.0.0)
-             # Draw a sample character to get height properties
-             test_char_bbox = font.getbbox("Xy")
-             single_line_height = test_char_bbox[3] - test_char_bbox[1] + line_padding # Height + padding
-             get_text_width = lambda text: font.getlength(text) if hasattr(font, 'getlength') else font.getbbox(text)[2] - font.getbbox(text)[0] if text else 0
-
-        except AttributeError:
-             # Fallback for older PIL/Pillow using getsize
-             logger.debug("Using legacy font.getsize() method for text metrics.")
-             size_sample = font.getsize("Xy")
-             single_line_height = size_sample[1] + line_padding
-             get_text_width = lambda text: font.getsize(text)[0] if text else 0
+            single_line_height, value_spacing, max_chars, legacy = _info_text_layout(font, font_size, value_column_width, line_padding)
         except Exception as metrics_e:
             logger.error(f"Could not determine text metrics with loaded font: {metrics_e}")
             return None
+        if legacy:
+            logger.debug("Using legacy font.getsize() method for text metrics.")
+            get_text_width = lambda text: font.getsize(text)[0] if text else 0
+        else:
+            get_text_width = lambda text: ascii_text_width(font, text) # Per-glyph width table; only decides wrapping
 
         # --- Prepare metadata text and calculate required height ---
         prepared_lines = [] # List of tuples: (key_text, [list_of_value_lines])
@@ -976,54 +1543,25 @@ class VideoProcessor:
             ("Duration", format_duration(self.metadata.get("duration",0))),
             ("Video", self.metadata.get("video_details", "N/A")),
             ("Audio", self.metadata.get("audio_details", "N/A")),
-            ("MD5", self.metadata.get("md5", "N/A")),
+            (self.metadata.get("hash_algorithm", "Hash"), self.metadata.get("content_hash", "N/A")),
         ]
 
         # Process each metadata row for wrapping
         for key, value in metadata_rows:
             if not isinstance(value, str): value = str(value) # Ensure value is a string
 
-            wrapped_value_lines = []
-            current_line = ""
-            # Simple word wrapping
-            value_words = value.split(' ')
-            for word in value_words:
-                test_line = current_line + (" " if current_line else "") + word
+            # Wrap by character count, then measure only the resulting lines and
+            # tighten the budget if a line with wide glyphs still overflows
+            chars = max_chars
+            wrapped_value_lines = textwrap.wrap(value, width=chars, break_long_words=True)
+            while chars > 1:
                 try:
-                    line_width = get_text_width(test_line)
-                except Exception as e:
-                    logger.warning(f"Could not get width for '{test_line}': {e}. Using rough estimate.")
-                    line_width = len(test_line) * font_size * 0.6 # Very rough fallback
-
-                if line_width <= value_column_width:
-                    current_line = test_line # Word fits, add to current line
-                else:
-                    # Word doesn't fit on current line
-                    if current_line: # If there was text on the line already, add it
-                        wrapped_value_lines.append(current_line)
-
-                    # Handle word longer than the entire line width by breaking it
-                    try:
-                        word_width = get_text_width(word)
-                    except Exception: word_width = len(word) * font_size * 0.6
-
-                    if word_width > value_column_width:
-                         logger.debug(f"Wrapping long word: {word}")
-                         # Simple character-based breaking for very long words
-                         avg_char_width = get_text_width("abc") / 3 if get_text_width("abc") > 0 else font_size * 0.6
-                         chars_per_line = max(1, int(value_column_width / avg_char_width)) if avg_char_width > 0 else 10
-                         temp_word = word
-                         while len(temp_word) > 0:
-                             wrapped_value_lines.append(temp_word[:chars_per_line])
-                             temp_word = temp_word[chars_per_line:]
-                         current_line = "" # Reset current line as the long word was fully processed
-                    else:
-                         # Start a new line with the current word
-                         current_line = word
-
-            # Add the last line if it has content
-            if current_line:
-                wrapped_value_lines.append(current_line)
+                    if all(get_text_width(line) <= value_column_width for line in wrapped_value_lines):
+                        break
+                except Exception:
+                    break
+                chars = max(1, int(chars * 0.9))
+                wrapped_value_lines = textwrap.wrap(value, width=chars, break_long_words=True)
 
             # If wrapping resulted in no lines (e.g., empty value), use "N/A"
             if not wrapped_value_lines: wrapped_value_lines = ["N/A"]
@@ -1045,22 +1583,12 @@ class VideoProcessor:
             value_x = side_margin + key_column_width + key_value_gap
             text_color = (230, 230, 230) # Light gray text
 
-            # Draw each prepared line
-            for key_text, value_lines in prepared_lines:
-                # Store starting Y for this key/value pair to align multi-line values correctly
-                pair_start_y = y
-                if key_text:
-                    # Draw the key text, aligned with the first line of the value
-                    draw.text((key_x, pair_start_y), key_text, font=font, fill=text_color)
-
-                # Draw the value lines
-                current_line_y = pair_start_y
-                for line in value_lines:
-                    draw.text((value_x, current_line_y), line, font=font, fill=text_color)
-                    current_line_y += single_line_height # Move Y down for the next value line
-
-                # Update the main Y position to the start of the next key/value pair
-                y = current_line_y
+            # One text block per column: each key is followed by blank lines for its value's extra
+            # wrapped lines, so it stays aligned with the first line of that value
+            key_block = "\n".join(key_text + "\n" * (len(value_lines) - 1) for key_text, value_lines in prepared_lines)
+            value_block = "\n".join("\n".join(value_lines) for _, value_lines in prepared_lines)
+            draw.multiline_text((key_x, y), key_block, font=font, fill=text_color, spacing=value_spacing)
+            draw.multiline_text((value_x, y), value_block, font=font, fill=text_color, spacing=value_spacing)
 
             # Define output path and save the image
             output_path = self.temp_dir / f"{self.base_filename}_info.png"
@@ -1072,78 +1600,6 @@ class VideoProcessor:
             if 'img' in locals() and hasattr(img, 'close'): img.close() # Ensure image is closed on error
             return None
 
-    def _stack_videos(self, input_paths: List[Path], output_path: Path, axis: str = 'h') -> bool:
-        """Stacks videos horizontally ('h') or vertically ('v') using ffmpeg filtergraph."""
-        if not input_paths:
-            logger.error("No input paths provided for stacking.")
-            return False
-
-        num_inputs = len(input_paths)
-        if num_inputs == 0 : return False # Should be caught above, but safety check
-        if num_inputs == 1: # No stacking needed, just copy/move? Or re-encode? Let's re-encode for consistency.
-             logger.debug(f"Only one input for stacking, re-encoding: {input_paths[0].name} -> {output_path.name}")
-             copy_cmd = f'ffmpeg -hide_banner -loglevel error -i "{input_paths[0]}" -c:v libx264 -crf 23 -preset medium -an -y "{output_path}"'
-             _, stderr, exit_code = run_command(copy_cmd)
-             if exit_code != 0: logger.error(f"Failed to copy single input for stacking: {stderr}"); return False
-             return True
-
-
-        stack_func = "hstack" if axis == 'h' else "vstack"
-        inputs_str = ' '.join([f'-i "{p}"' for p in input_paths]) # Prepare '-i path' arguments
-
-        # --- Ensure consistent resolution before stacking ---
-        # Get dimensions of the first video as the target
-        first_vid_meta_cmd = f'ffprobe -v error -select_streams v:0 -show_entries stream=width,height -of csv=p=0:s=x "{input_paths[0]}"'
-        stdout, _, code = run_command(first_vid_meta_cmd)
-        target_w, target_h = -1, -1 # Initialize
-        if code == 0 and 'x' in stdout:
-            try: target_w, target_h = map(int, stdout.strip().split('x'))
-            except ValueError: logger.warning("Could not parse dimensions from first video for stacking.")
-        else: logger.warning(f"Could not get dimensions of first video '{input_paths[0].name}' for stacking.")
-
-        # Fallback dimensions if probe failed (use typical segment dimensions)
-        if target_w <= 0 or target_h <= 0:
-             target_w, target_h = (270, 480) if self.is_vertical and not self.config.ADD_BLACK_BARS else (480, 270)
-             logger.warning(f"Using fallback dimensions for stacking: {target_w}x{target_h}")
-
-        # Create scale filter parts for each input
-        scale_filters = ""
-        scaled_inputs_refs = []
-        for i in range(num_inputs):
-            scaled_ref = f"[scaled{i}]"
-            # Scale each input [i:v] to target WxH and assign to [scaled_i]
-            scale_filters += f"[{i}:v]scale={target_w}:{target_h}:force_original_aspect_ratio=disable[scaled{i}];"
-            scaled_inputs_refs.append(scaled_ref)
-
-        # Concatenate the references to the scaled inputs (e.g., [scaled0][scaled1][scaled2])
-        filter_inputs_scaled = ''.join(scaled_inputs_refs)
-
-        # Combine scale filters and the stack filter
-        filter_complex = f'"{scale_filters}{filter_inputs_scaled}{stack_func}=inputs={num_inputs}[v]"'
-
-        # Map the final output stream [v]
-        map_str = '-map "[v]"'
-        # Use a reasonable output FPS
-        fps_output = f"-r {self.metadata.get('fps', 24):.2f}" # Use video FPS or default 24
-
-        # Construct the full ffmpeg command
-        command = (f'ffmpeg -hide_banner -loglevel error {inputs_str} '
-                   f'-filter_complex {filter_complex} {map_str} '
-                   f'-c:v libx264 -crf 23 -preset medium ' # Encode output
-                   f'{fps_output} -an -y "{output_path}"') # Set FPS, no audio, overwrite
-
-        logger.debug(f"Stacking command ({axis}, {num_inputs} inputs): {command}")
-        _, stderr, exit_code = run_command(command)
-
-        if exit_code != 0:
-            logger.error(f"Video stacking ({axis}) failed. Exit Code: {exit_code}")
-            if stderr: logger.error(f"  FFmpeg stderr: {stderr}")
-            output_path.unlink(missing_ok=True) # Clean up failed output
-            return False
-
-        logger.debug(f"Stacked video created ({axis}): {output_path.name}")
-        return True
-
     def _generate_webp_preview_sheet(self) -> bool:
         """Generates the animated WebP preview sheet with info header."""
         logger.info("Generating animated WebP preview sheet...")
@@ -1159,128 +1615,62 @@ class VideoProcessor:
             logger.error("Failed to create info image header. Cannot generate WebP sheet.")
             return False
 
-        # 2. Create a video from the info image
+        # 2. The info image is fed to the sheet graph as a looped still input (no encode of its own)
         # Match the duration of the video segments (use config value)
         info_video_duration = self.config.SEGMENT_DURATION
         if not info_video_duration > 0:
              logger.error("Invalid segment duration in config, cannot create info video.")
              return False
-        info_video_path = self.temp_dir / f"{self.base_filename}_info_video.mp4"
-        cmd_info_vid = (f'ffmpeg -hide_banner -loglevel error -loop 1 ' # Loop the image input
-                        f'-framerate {self.metadata.get("fps", 24):.2f} ' # Match video FPS
-                        f'-t {info_video_duration:.3f} ' # Set duration
-                        f'-i "{info_image_path}" ' # Input image
-                        f'-c:v libx264 -pix_fmt yuv420p ' # Encode to common format
-                        f'-y "{info_video_path}"')
-        logger.debug(f"Info video generation command: {cmd_info_vid}")
-        _, stderr, code = run_command(cmd_info_vid)
-        if code != 0:
-            logger.error(f"Failed to create video from info image. Exit Code: {code}")
-            if stderr: logger.error(f"  FFmpeg stderr: {stderr}")
-            return False
-        logger.debug("Info header video created.")
-
+        info_input = ["-loop", "1", # Loop the image input
+                      "-framerate", self.fps_str, # Match video FPS
+                      "-t", self.segment_duration_str, # Set duration
+                      "-i", str(info_image_path)] # Input image
 
-        # 3. Stack segments horizontally into rows
+        # 3. Lay the segments out on the grid; only the last row can be partial
         grid = self.config.GRID_WIDTH
-        h_stacked_videos = [] # List to hold paths of the horizontally stacked row videos
         num_segments = len(sheet_segments)
         num_rows = (num_segments + grid - 1) // grid # Calculate number of rows needed
-
-        for r in range(num_rows):
-            row_start_index = r * grid
-            row_end_index = min((r + 1) * grid, num_segments)
-            group = sheet_segments[row_start_index : row_end_index]
-
-            if not group: continue # Skip if group is empty (shouldn't happen with calculation)
-
-            # If the last row is partial, pad it with black videos
-            num_missing = grid - len(group)
-            if num_missing > 0:
-                 logger.warning(f"Row {r+1} is partial ({len(group)}/{grid} segments). Padding with black videos.")
-                 # Create a black video placeholder matching the first segment's properties
-                 first_seg_path = group[0]
-                 # Get dimensions, duration, FPS from the first segment in the group
-                 ffprobe_cmd = (f'ffprobe -v error -select_streams v:0 '
-                                f'-show_entries stream=width,height,r_frame_rate -show_entries format=duration '
-                                f'-of default=noprint_wrappers=1:nokey=1 "{first_seg_path}"')
-                 stdout, _, p_code = run_command(ffprobe_cmd)
-                 w, h, fps, dur = 480, 270, f"{self.metadata.get('fps', 24):.2f}", f"{self.config.SEGMENT_DURATION:.3f}" # Defaults
-                 if p_code == 0 and stdout:
-                    lines = stdout.strip().split('\n')
-                    try: # Robust parsing
-                        w = int(lines[0]) if len(lines)>0 else w
-                        h = int(lines[1]) if len(lines)>1 else h
-                        fps_str = lines[2] if len(lines)>2 else fps
-                        if '/' in fps_str: num, den = map(int, fps_str.split('/')); fps = f"{num/den:.2f}" if den else fps
-                        dur = f"{float(lines[3]):.3f}" if len(lines)>3 else dur
-                    except (ValueError, IndexError, ZeroDivisionError) as parse_e:
-                        logger.warning(f"Failed parsing segment properties for black placeholder: {parse_e}. Using defaults.")
-
-                 black_vid_path = self.temp_dir / f"black_placeholder_row{r+1}.mp4"
-                 cmd_black = (f'ffmpeg -hide_banner -loglevel error -f lavfi '
-                              f'-i color=c=black:s={w}x{h}:r={fps}:d={dur} ' # Use detected/default properties
-                              f'-c:v libx264 -pix_fmt yuv420p -y "{black_vid_path}"')
-
-                 logger.debug(f"Black placeholder command: {cmd_black}")
-                 _, black_stderr, black_code = run_command(cmd_black)
-                 if black_code != 0:
-                     logger.error(f"Failed to create black placeholder video for row {r+1}. Stderr: {black_stderr}. Aborting sheet generation.")
-                     return False
-                 # Add the required number of black placeholders to the group
-                 group.extend([black_vid_path] * num_missing)
-
-            # Stack the (potentially padded) group horizontally
-            h_stack_output = self.temp_dir / f"hstacked_row_{r + 1}.mp4"
-            if not self._stack_videos(group, h_stack_output, axis='h'):
-                 logger.error(f"Failed to horizontally stack videos for row {r+1}.")
-                 return False
-            h_stacked_videos.append(h_stack_output)
-
-        if not h_stacked_videos:
-             logger.error("Horizontal stacking resulted in no row videos.")
-             return False
-
-        # 4. Stack the info video and all horizontal rows vertically
-        final_sheet_video_path = self.temp_dir / f"{self.base_filename}_final_sheet_raw.mp4"
-        all_v_inputs = [info_video_path] + h_stacked_videos # Info video first, then rows
-        if not self._stack_videos(all_v_inputs, final_sheet_video_path, axis='v'):
-             logger.error("Failed to vertically stack info header and rows.")
-             return False
-
-        # 5. Optional: Downscale the final sheet video if grid=4 and landscape
-        final_processed_sheet_path = final_sheet_video_path # Start with the raw stacked path
-        # Condition matches original script: Grid=4 AND (video is landscape OR black bars were added to vertical)
-        is_landscape_effective = not self.is_vertical or self.config.ADD_BLACK_BARS
-        if self.config.GRID_WIDTH == 4 and is_landscape_effective:
-             logger.info("Grid=4 and effective landscape orientation detected. Attempting downscale.")
-             downscaled_path = self.temp_dir / f"{self.base_filename}_final_sheet_downscaled.mp4"
-             # Target width 1280px, maintain aspect ratio (-2)
-             scale_filter = "scale=1280:-2"
-             cmd_downscale = (f'ffmpeg -hide_banner -loglevel error -i "{final_sheet_video_path}" '
-                              f'-vf "{scale_filter}" -c:v libx264 -crf 22 -preset medium -y "{downscaled_path}"')
-             logger.debug(f"Downscaling command: {cmd_downscale}")
-             _, stderr, code = run_command(cmd_downscale)
-             if code == 0 and downscaled_path.exists() and downscaled_path.stat().st_size > 0:
-                 logger.info("Downscaled grid=4 sheet video successfully.")
-                 final_processed_sheet_path = downscaled_path # Use the downscaled version
-                 # Optional: Clean up the larger raw file? Keep it simple for now.
-             else:
-                 logger.warning(f"Downscaling grid=4 sheet video failed (Exit Code: {code}). Stderr: {stderr}. Using original resolution sheet.")
-                 # Keep final_processed_sheet_path as final_sheet_video_path
-
-        # 6. Convert the final processed sheet video to animated WebP
+        # Input arguments of every grid cell in row-major order
+        cells = [["-i", str(segment)] for segment in sheet_segments]
+
+        # If the last row is partial, pad it with black cells
+        num_missing = num_rows * grid - num_segments
+        if num_missing > 0:
+             logger.warning(f"Row {num_rows} is partial ({grid - num_missing}/{grid} segments). Padding with black videos.")
+             # Black lavfi sources matching the segments (their size, the source FPS, the configured duration),
+             # generated inside the sheet graph itself
+             w, h = self.segment_dims
+             fps, dur = self.fps_str, self.segment_duration_str
+             cells.extend([["-f", "lavfi", "-t", dur, "-i", f"color=c=black:s={w}x{h}:r={fps}"]] * num_missing)
+
+        # 4. Compose the whole sheet in one ffmpeg: xstack places every (pre-scaled) cell, vstack puts the info
+        #    header on top, and the result goes straight to the WebP encoder (no per-row or raw sheet videos)
+        cell_w, cell_h = self.segment_dims
+        cell_labels = "".join(f"[{i + 1}:v]" for i in range(len(cells))) # Input 0 is the info header
+        # Grid=4 AND (video is landscape OR black bars were added to vertical): downscale to 1280px wide
+        downscale = ",scale=1280:-2:flags=lanczos" if self.config.GRID_WIDTH == 4 and self.is_landscape_effective else ""
+        grid_filter = f"xstack=inputs={len(cells)}:layout={_xstack_layout(grid, num_rows, cell_w, cell_h)}"
+        filter_graph = (f"{cell_labels}{grid_filter}[grid];"
+                        f"[0:v][grid]vstack=inputs=2,fps=24{downscale}[v]")
+
+        # 5. Encode the composed sheet to animated WebP (in-process with PyAV if available, else one ffmpeg)
         output_webp = self.output_dir / f"{self.base_filename}_preview_sheet.webp"
-        cmd_webp = (f'ffmpeg -hide_banner -loglevel error -y '
-                    f'-i "{final_processed_sheet_path}" ' # Input the (potentially downscaled) sheet video
-                    f'-vf "fps=24,scale=iw:ih:flags=lanczos" ' # Ensure 24fps, lanczos scaling (iw:ih keeps current size)
-                    f'-c:v libwebp -quality 75 -lossless 0 -loop 0 -an -vsync 0 ' # WebP options
-                    f'"{output_webp}"')
+        if av is not None and self.config.USE_PYAV and self._generate_webp_preview_sheet_pyav(
+                info_image_path, sheet_segments, num_missing, grid_filter, downscale, output_webp):
+            logger.success(f"Animated WebP preview sheet created: {output_webp.name}")
+            return True
+        cmd_webp = (["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *FFMPEG_THREAD_ARGS,
+                     *info_input] # Info header first
+                    + [arg for cell in cells for arg in cell] +
+                    ["-filter_complex", filter_graph, "-map", "[v]",
+                     "-c:v", "libwebp", "-quality", "75", "-lossless", "0", "-threads", "0", # WebP options
+                     "-loop", "0", "-an", "-vsync", "0",
+                     str(output_webp)])
 
         logger.debug(f"Final WebP sheet generation command: {cmd_webp}")
         _, stderr, code = run_command(cmd_webp)
 
-        if code == 0 and output_webp.exists() and output_webp.stat().st_size > 0:
+        if code == 0 and _file_size(output_webp) > 0:
             logger.success(f"Animated WebP preview sheet created: {output_webp.name}")
             return True
         else:
@@ -1289,10 +1679,101 @@ class VideoProcessor:
             output_webp.unlink(missing_ok=True) # Clean up failed output
             return False
 
+    def _generate_webp_preview_sheet_pyav(self, info_image_path: Path, segments: List[Path], num_missing: int,
+                                          grid_filter: str, downscale: str, output_webp: Path) -> bool:
+        """
+        PyAV variant of the sheet ffmpeg: the segments are decoded in-process, pushed through the same
+        xstack/vstack/fps(/scale) filtergraph and encoded to WebP. Returns False on any error (ffmpeg CLI takes over).
+        """
+        fps = Fraction(self.metadata.get('fps') or 24).limit_denominator(1001)
+        cell_w, cell_h = self.segment_dims
+        containers, output = [], None
+        try:
+            containers = [av.open(str(path)) for path in segments]
+            with Image.open(info_image_path) as info_img:
+                info_frame = av.VideoFrame.from_image(_as_rgb(info_img))
+
+            # Sources: the info header, every segment and the black padding cells (color sources in the graph)
+            graph = av.filter.Graph()
+            info_src = graph.add_buffer(width=info_frame.width, height=info_frame.height, format="rgb24", time_base=1 / fps)
+            sources = [graph.add_buffer(template=container.streams.video[0]) for container in containers]
+            padding = [graph.add("color", f"c=black:s={cell_w}x{cell_h}:r={fps}:d={self.segment_duration_str}")
+                       for _ in range(num_missing)]
+            grid_name, _, grid_args = grid_filter.partition("=")
+            grid_node = graph.add(grid_name, grid_args)
+            for k, node in enumerate(sources + padding):
+                node.link_to(grid_node, 0, k)
+            vstack = graph.add("vstack", "inputs=2")
+            info_src.link_to(vstack, 0, 0)
+            grid_node.link_to(vstack, 0, 1)
+            tail = graph.add("fps", "24")
+            vstack.link_to(tail)
+            if downscale:
+                scale_name, _, scale_args = downscale.lstrip(",").partition("=")
+                scale = graph.add(scale_name, scale_args)
+                tail.link_to(scale)
+                tail = scale
+            pix_fmt = graph.add("format", "yuv420p") # What libwebp encodes
+            tail.link_to(pix_fmt)
+            sink = graph.add("buffersink")
+            pix_fmt.link_to(sink)
+            graph.configure()
+
+            # Size the ffmpeg CLI graph produces: info header on top of the grid rows, then the optional
+            # scale=1280:-2 (height rescaled to nearest, kept even). add_stream() defaults to 640x480, so it is set here.
+            sheet_w = info_frame.width
+            sheet_h = info_frame.height + (len(segments) + num_missing) // self.config.GRID_WIDTH * cell_h
+            if downscale:
+                sheet_w, sheet_h = 1280, 2 * int(Fraction(1280 * sheet_h, 2 * sheet_w) + Fraction(1, 2))
+            output = av.open(str(output_webp), "w", format="webp", options={"loop": "0"})
+            stream = output.add_stream("libwebp", rate=24)
+            stream.width, stream.height = sheet_w, sheet_h
+            stream.pix_fmt = "yuv420p"
+            stream.options = {"quality": "75", "lossless": "0"}
+
+            def encode_ready():
+                while True:
+                    try: frame = sink.pull()
+                    except (BlockingIOError, EOFError): return # Needs more input / graph finished
+                    if (frame.width, frame.height) != (sheet_w, sheet_h): # Must match the ffmpeg CLI output
+                        raise ValueError(f"graph produced {frame.width}x{frame.height}, expected {sheet_w}x{sheet_h}")
+                    output.mux(stream.encode(frame))
+
+            def info_frames():
+                for i in range(max(1, round(self.config.SEGMENT_DURATION * fps))):
+                    info_frame.pts = i
+                    yield info_frame
+
+            # Feed all inputs round-robin (one frame each per round) so the graph never buffers a whole segment
+            feeds = [(info_src, info_frames())] + [(src, c.decode(video=0)) for src, c in zip(sources, containers)]
+            while feeds:
+                for feed in list(feeds):
+                    frame = next(feed[1], None)
+                    feed[0].push(frame) # None signals EOF on that input
+                    if frame is None:
+                        feeds.remove(feed)
+                encode_ready()
+            encode_ready()
+            output.mux(stream.encode(None)) # Flush the encoder
+            output.close()
+            output = None
+            if _file_size(output_webp) > 0:
+                return True
+            logger.warning("PyAV produced an empty WebP sheet. Falling back to ffmpeg.")
+        except Exception as e:
+            logger.warning(f"PyAV WebP sheet generation failed: {e}. Falling back to ffmpeg.")
+        finally:
+            if output is not None: # Failed midway: the half-written file is removed below
+                try: output.close()
+                except Exception: pass
+            for container in containers:
+                container.close()
+        output_webp.unlink(missing_ok=True)
+        return False
+
     def _extract_segment_frames(self) -> List[Path]:
         """Extracts a single frame from near the middle of each base segment video."""
         logger.info("Extracting frames for static image sheet...")
-        extracted_frames = []
         # Use the base segments *before* timestamp overlay for frame extraction
         segments_to_frame = self.segment_files
         if not segments_to_frame:
@@ -1304,52 +1785,16 @@ class VideoProcessor:
         mid_point_time = self.config.SEGMENT_DURATION / 2.0
         fallback_seek_time = 0.1 # Time to seek to if midpoint fails
 
-        for i, segment_path in enumerate(segments_to_frame):
-            # Generate a unique frame filename based on the segment filename
-            frame_filename = f"frame_{segment_path.stem}.png" # Use PNG for lossless frames
-            frame_path = self.temp_dir / frame_filename
-            frame_extracted = False
-
-            # Ensure segment file exists before trying to extract
-            if not segment_path.exists():
-                logger.warning(f"Segment file missing, cannot extract frame: {segment_path.name}")
-                continue
-
-            # Attempt 1: Extract frame near the middle
-            logger.debug(f"Attempting frame extraction (midpoint {mid_point_time:.3f}s) for: {segment_path.name}")
-            # Use -ss before -i for faster seeking, -frames:v 1 to grab one frame
-            cmd_frame_mid = (f'ffmpeg -hide_banner -loglevel error '
-                             f'-ss {mid_point_time:.3f} -i "{segment_path}" '
-                             f'-frames:v 1 -q:v 2 "{frame_path}" -y') # -q:v 2 is high quality for JPG/PNG
-            _, stderr_mid, code_mid = run_command(cmd_frame_mid)
-
-            if code_mid == 0 and frame_path.exists() and frame_path.stat().st_size > 100: # Check if file exists and has some size
-                frame_extracted = True
-                logger.debug(f"Extracted frame {i+1}/{num_segments} (midpoint): {frame_path.name}")
-            else:
-                logger.warning(f"Midpoint frame ({mid_point_time:.3f}s) extraction failed for {segment_path.name}. ExitCode: {code_mid}. Stderr: {stderr_mid}")
-                frame_path.unlink(missing_ok=True) # Clean up potentially empty/corrupt file
-
-                # Attempt 2: Extract frame near the beginning (fallback)
-                logger.debug(f"Attempting frame extraction (fallback {fallback_seek_time:.3f}s) for: {segment_path.name}")
-                cmd_frame_fallback = (f'ffmpeg -hide_banner -loglevel error '
-                                      f'-ss {fallback_seek_time:.3f} -i "{segment_path}" '
-                                      f'-frames:v 1 -q:v 2 "{frame_path}" -y')
-                _, stderr_fallback, code_fallback = run_command(cmd_frame_fallback)
-
-                if code_fallback == 0 and frame_path.exists() and frame_path.stat().st_size > 100:
-                    frame_extracted = True
-                    logger.debug(f"Extracted frame {i+1}/{num_segments} (fallback {fallback_seek_time:.3f}s): {frame_path.name}")
-                else:
-                    logger.error(f"Fallback frame ({fallback_seek_time:.3f}s) extraction also failed for {segment_path.name}. ExitCode: {code_fallback}. Stderr: {stderr_fallback}")
-                    frame_path.unlink(missing_ok=True) # Clean up failed fallback attempt
-
-            # Add the successfully extracted frame path to the list
-            if frame_extracted:
-                extracted_frames.append(frame_path)
-            else:
-                # Log error if both attempts failed for a segment
-                logger.error(f"Could not extract a valid frame for segment: {segment_path.name}")
+        # One ffmpeg grabs every midpoint frame; only segments it didn't deliver go through the per-segment
+        # midpoint/fallback path, concurrently (bounded like the segment ffmpegs), keeping order
+        batch_frames = self._extract_midframes_batched(segments_to_frame, mid_point_time)
+        def extract(indexed_segment: Tuple[int, Path]) -> Optional[Path]:
+            i, segment_path = indexed_segment
+            if batch_frames[i]:
+                return batch_frames[i]
+            return self._extract_one_frame(i, num_segments, segment_path, mid_point_time, fallback_seek_time)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.config.MAX_CONCURRENT_FFMPEG, num_segments))) as pool:
+            extracted_frames = [frame for frame in pool.map(extract, enumerate(segments_to_frame)) if frame]
 
         # Log summary of frame extraction
         if not extracted_frames:
@@ -1359,14 +1804,124 @@ class VideoProcessor:
 
         return extracted_frames
 
+    def _extract_segment_frames_to_memory(self) -> List["Image.Image"]:
+        """
+        Decode the midpoint frame of every segment as raw RGB from one ffmpeg (rgb24 on stdout) into PIL images,
+        skipping the PNG encode/decode round trip. Returns [] if any frame is missing (the PNG path takes over).
+        """
+        segments = self.segment_files
+        if not segments or not all(path.exists() for path in segments) or not _require_pil():
+            return []
+        frame_w, frame_h = self.segment_dims # Every segment is scaled/padded to these
+        frame_size = frame_w * frame_h * 3
+        mid_point_time = self.config.SEGMENT_DURATION / 2.0
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", *FFMPEG_THREAD_ARGS]
+        seek_args = _thumbnail_seek_args(mid_point_time) # Same for every segment, built once
+        for path in segments:
+            cmd += [*seek_args, "-i", str(path)] # Seek before -i (input seek)
+        # First frame after each seek, concatenated into one stream of N frames
+        trims = "".join(f"[{k}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS[f{k}];" for k in range(len(segments)))
+        concat = "".join(f"[f{k}]" for k in range(len(segments)))
+        cmd += ["-filter_complex", f"{trims}{concat}concat=n={len(segments)}:v=1:a=0[v]", "-map", "[v]",
+                "-vsync", "0", # Pass every frame: the trimmed frames have near-identical timestamps (CFR sync drops them)
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"]
+        logger.debug(f"In-memory frame extraction command ({len(segments)} segments): {cmd}")
+        raw, stderr, code = run_command(cmd, text=False)
+        if code != 0 or len(raw) != frame_size * len(segments):
+            logger.warning(f"In-memory frame extraction returned {len(raw) // frame_size}/{len(segments)} frames "
+                           f"(Exit Code: {code}). Extracting frames to files.")
+            if stderr: logger.debug(f"  FFmpeg stderr: {stderr}")
+            return []
+        frames = [Image.frombytes("RGB", (frame_w, frame_h), raw[k * frame_size:(k + 1) * frame_size])
+                  for k in range(len(segments))]
+        logger.debug(f"Decoded {len(frames)} frames ({frame_w}x{frame_h}) in memory for the image sheet")
+        return frames
+
+    def _frame_path(self, segment_path: Path) -> Path:
+        """Unique frame filename based on the segment filename (PNG for lossless frames)."""
+        return self.temp_dir / f"frame_{segment_path.stem}.png"
+
+    def _extract_midframes_batched(self, segment_paths: List[Path], mid_point_time: float) -> List[Optional[Path]]:
+        """
+        Extract the midpoint frame of every segment with a single ffmpeg (a seeked input and a one-frame output per
+        segment). Returns the frame path per segment, None where it wasn't produced.
+        """
+        present = [(k, path) for k, path in enumerate(segment_paths) if path.exists()]
+        frames: List[Optional[Path]] = [None] * len(segment_paths)
+        if not present:
+            return frames
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", *FFMPEG_THREAD_ARGS]
+        seek_args = _thumbnail_seek_args(mid_point_time) # Same for every segment, built once
+        for _, path in present:
+            cmd += [*seek_args, "-i", str(path)] # Seek before -i (input seek)
+        for n, (_, path) in enumerate(present):
+            cmd += ["-map", f"{n}:v:0", "-frames:v", "1", "-q:v", "2", "-y", str(self._frame_path(path))]
+        logger.debug(f"Batched frame extraction command ({len(present)} segments): {cmd}")
+        _, stderr, code = run_command(cmd)
+        if code != 0:
+            logger.warning(f"Batched frame extraction failed (Exit Code: {code}). Extracting frames per segment.")
+            if stderr: logger.debug(f"  FFmpeg stderr: {stderr}")
+        for k, path in present:
+            frame_path = self._frame_path(path)
+            if code == 0 and _file_size(frame_path) > 100: # Check if file exists and has some size
+                frames[k] = frame_path
+        return frames
+
+    def _extract_one_frame(self, i: int, num_segments: int, segment_path: Path,
+                           mid_point_time: float, fallback_seek_time: float) -> Optional[Path]:
+        """Extract one frame of a segment (midpoint, then the fallback time). Returns the frame path or None."""
+        frame_path = self._frame_path(segment_path)
+        frame_extracted = False
+
+        # Ensure segment file exists before trying to extract
+        if not segment_path.exists():
+            logger.warning(f"Segment file missing, cannot extract frame: {segment_path.name}")
+            return None
+
+        # Attempt 1: Extract frame near the middle
+        logger.debug(f"Attempting frame extraction (midpoint {mid_point_time:.3f}s) for: {segment_path.name}")
+        # Use a keyframe input seek before -i for faster seeking, -frames:v 1 to grab one frame
+        cmd_frame_mid = ["ffmpeg", "-hide_banner", "-loglevel", "error", *FFMPEG_THREAD_ARGS,
+                         *_thumbnail_seek_args(mid_point_time), "-i", str(segment_path),
+                         "-frames:v", "1", "-q:v", "2", str(frame_path), "-y"] # -q:v 2 is high quality for JPG/PNG
+        _, stderr_mid, code_mid = run_command(cmd_frame_mid)
+
+        if code_mid == 0 and _file_size(frame_path) > 100: # Check if file exists and has some size
+            frame_extracted = True
+            logger.debug(f"Extracted frame {i+1}/{num_segments} (midpoint): {frame_path.name}")
+        else:
+            logger.warning(f"Midpoint frame ({mid_point_time:.3f}s) extraction failed for {segment_path.name}. ExitCode: {code_mid}. Stderr: {stderr_mid}")
+            frame_path.unlink(missing_ok=True) # Clean up potentially empty/corrupt file
+
+            # Attempt 2: Extract frame near the beginning (fallback)
+            logger.debug(f"Attempting frame extraction (fallback {fallback_seek_time:.3f}s) for: {segment_path.name}")
+            cmd_frame_fallback = ["ffmpeg", "-hide_banner", "-loglevel", "error", *FFMPEG_THREAD_ARGS,
+                                  *_thumbnail_seek_args(fallback_seek_time), "-i", str(segment_path),
+                                  "-frames:v", "1", "-q:v", "2", str(frame_path), "-y"]
+            _, stderr_fallback, code_fallback = run_command(cmd_frame_fallback)
+
+            if code_fallback == 0 and _file_size(frame_path) > 100:
+                frame_extracted = True
+                logger.debug(f"Extracted frame {i+1}/{num_segments} (fallback {fallback_seek_time:.3f}s): {frame_path.name}")
+            else:
+                logger.error(f"Fallback frame ({fallback_seek_time:.3f}s) extraction also failed for {segment_path.name}. ExitCode: {code_fallback}. Stderr: {stderr_fallback}")
+                frame_path.unlink(missing_ok=True) # Clean up failed fallback attempt
+
+        if frame_extracted:
+            return frame_path
+        # Log error if both attempts failed for a segment
+        logger.error(f"Could not extract a valid frame for segment: {segment_path.name}")
+        return None
+
     def _generate_image_preview_sheet(self) -> bool:
         """Generates the static image preview sheet using PIL."""
         logger.info("Generating static image preview sheet...")
-        if not self.segment_frame_files:
+        frames: List[Any] = self.segment_frame_images or self.segment_frame_files # PIL images or PNG paths
+        if not frames:
             logger.error("No frames were extracted. Cannot generate image sheet.")
             return False
 
-        # 1. Create the info image header
+        # 1. Create the info image header (also makes sure Pillow is loaded)
         info_image_path = self._create_info_image()
         if not info_image_path:
             logger.error("Info image header failed, cannot generate image sheet accurately.")
@@ -1380,24 +1935,28 @@ class VideoProcessor:
                 info_w, info_h = info_img.size
                 logger.debug(f"Using info image dimensions: {info_w}x{info_h}")
 
-                # 3. Open first frame to get segment frame dimensions
-                try:
-                    # Ensure first frame exists before proceeding
-                    if not self.segment_frame_files[0].exists():
-                         raise FileNotFoundError(f"First frame image not found: {self.segment_frame_files[0]}")
-                    with Image.open(self.segment_frame_files[0]) as first_frame_img:
-                        frame_w, frame_h = first_frame_img.size
-                        logger.debug(f"Detected frame dimensions: {frame_w}x{frame_h}")
-                except FileNotFoundError as e:
-                    logger.error(str(e)); return False
-                except Exception as e:
-                    logger.error(f"Failed to open or get dimensions of first frame '{self.segment_frame_files[0].name}': {e}")
-                    return False # Cannot proceed without frame dimensions
+                # 3. Get segment frame dimensions from the first frame (opening it if it is a file)
+                if self.segment_frame_images:
+                    frame_w, frame_h = self.segment_frame_images[0].size
+                    logger.debug(f"Detected frame dimensions: {frame_w}x{frame_h}")
+                else:
+                    try:
+                        # Ensure first frame exists before proceeding
+                        if not frames[0].exists():
+                             raise FileNotFoundError(f"First frame image not found: {frames[0]}")
+                        with Image.open(frames[0]) as first_frame_img:
+                            frame_w, frame_h = first_frame_img.size
+                            logger.debug(f"Detected frame dimensions: {frame_w}x{frame_h}")
+                    except FileNotFoundError as e:
+                        logger.error(str(e)); return False
+                    except Exception as e:
+                        logger.error(f"Failed to open or get dimensions of first frame '{frames[0].name}': {e}")
+                        return False # Cannot proceed without frame dimensions
 
                 # 4. Calculate sheet dimensions
                 grid = self.config.GRID_WIDTH
                 num_frames_expected = self.config.NUM_OF_SEGMENTS # Use configured segment count for layout
-                num_frames_extracted = len(self.segment_frame_files) # Actual number of frames available
+                num_frames_extracted = len(frames) # Actual number of frames available
                 # Calculate rows based on *expected* number of frames to maintain grid structure
                 num_rows = (num_frames_expected + grid - 1) // grid
 
@@ -1407,42 +1966,44 @@ class VideoProcessor:
                 sheet_height = info_h + (num_rows * frame_h)
                 logger.debug(f"Calculated sheet dimensions: {sheet_width}x{sheet_height} ({num_rows} rows)")
 
-                # 5. Create blank sheet image
-                final_sheet_img = Image.new("RGB", (sheet_width, sheet_height), color=(40, 40, 40)) # Dark gray background
-                # 6. Paste info image header at the top
-                final_sheet_img.paste(info_img, (0, 0))
+                # 5. Allocate the sheet as one RGB array (dark gray background)
+                sheet = np.full((sheet_height, sheet_width, 3), 40, dtype=np.uint8)
+                # 6. Blit the info image header at the top
+                sheet[:info_h, :info_w] = np.asarray(_as_rgb(info_img))
 
-            # 7. Paste extracted frames onto the sheet
-            for i, frame_path in enumerate(self.segment_frame_files):
+            # 7. Blit extracted frames into the sheet (slice assignment); failed ones get placeholders afterwards
+            placeholders: List[Tuple[int, int, str]] = []
+            for i, frame in enumerate(frames):
                 # Calculate position based on index (0-based)
                 paste_x = (i % grid) * frame_w
                 paste_y = info_h + (i // grid) * frame_h
+                if not isinstance(frame, Path): # Decoded in memory, all at the segment size
+                    sheet[paste_y:paste_y + frame_h, paste_x:paste_x + frame_w] = np.asarray(frame)
+                    continue
                 try:
-                    with Image.open(frame_path) as frame_img:
+                    with Image.open(frame) as frame_img:
+                         frame_img = _as_rgb(frame_img)
                          # Optional: Verify frame dimensions and resize if needed (log warning)
                          if frame_img.size != (frame_w, frame_h):
-                              logger.warning(f"Frame {frame_path.name} has unexpected dimensions {frame_img.size}, expected {frame_w}x{frame_h}. Resizing.")
+                              logger.warning(f"Frame {frame.name} has unexpected dimensions {frame_img.size}, expected {frame_w}x{frame_h}. Resizing.")
                               frame_img = frame_img.resize((frame_w, frame_h), Image.Resampling.LANCZOS) # Use high quality resize
-                         # Paste the frame
-                         final_sheet_img.paste(frame_img.copy(), (paste_x, paste_y)) # Paste a copy
+                         sheet[paste_y:paste_y + frame_h, paste_x:paste_x + frame_w] = np.asarray(frame_img)
                 except FileNotFoundError:
-                    logger.error(f"Frame image not found during pasting: {frame_path.name}")
-                    # Draw error placeholder
-                    self._draw_placeholder(final_sheet_img, paste_x, paste_y, frame_w, frame_h, f"Error\nMissing\nFrame {i+1}")
+                    logger.error(f"Frame image not found during pasting: {frame.name}")
+                    placeholders.append((paste_x, paste_y, f"Error\nMissing\nFrame {i+1}"))
                 except Exception as e:
-                    logger.error(f"Failed to open/paste frame {frame_path.name}: {e}")
-                    # Draw error placeholder
-                    self._draw_placeholder(final_sheet_img, paste_x, paste_y, frame_w, frame_h, f"Error\nLoad/Paste\nFrame {i+1}")
-
+                    logger.error(f"Failed to open/paste frame {frame.name}: {e}")
+                    placeholders.append((paste_x, paste_y, f"Error\nLoad/Paste\nFrame {i+1}"))
 
             # 8. Fill remaining grid slots if fewer frames were extracted than configured
             if num_frames_extracted < num_frames_expected:
                 logger.warning(f"Only {num_frames_extracted}/{num_frames_expected} frames available. Filling remaining grid slots with placeholders.")
                 for i in range(num_frames_extracted, num_frames_expected):
-                    paste_x = (i % grid) * frame_w
-                    paste_y = info_h + (i // grid) * frame_h
-                    # Draw missing placeholder
-                    self._draw_placeholder(final_sheet_img, paste_x, paste_y, frame_w, frame_h, f"Missing\nFrame {i+1}")
+                    placeholders.append(((i % grid) * frame_w, info_h + (i // grid) * frame_h, f"Missing\nFrame {i+1}"))
+
+            final_sheet_img = Image.fromarray(sheet) # uint8 HxWx3 -> RGB
+            for paste_x, paste_y, text in placeholders:
+                self._draw_placeholder(final_sheet_img, paste_x, paste_y, frame_w, frame_h, text)
 
             # 9. Save the final sheet image
             output_suffix = f".{self.config.IMAGE_SHEET_FORMAT.lower()}"
@@ -1469,15 +2030,13 @@ class VideoProcessor:
 
         return sheet_created
 
-    def _draw_placeholder(self, image: Image.Image, x: int, y: int, w: int, h: int, text: str):
+    def _draw_placeholder(self, image: "Image.Image", x: int, y: int, w: int, h: int, text: str):
         """Draws a placeholder rectangle with text on the image."""
         try:
             draw = ImageDraw.Draw(image)
             # Dark red rectangle, slightly inset
             draw.rectangle([x + 2, y + 2, x + w - 2, y + h - 2], fill=(60, 0, 0), outline=(120, 0, 0))
-            # Load default font for placeholder text
-            try: placeholder_font = ImageFont.load_default(size=10)
-            except TypeError: placeholder_font = ImageFont.load_default()
+            placeholder_font = get_placeholder_font()
             # Draw text centered (approximately)
             text_bbox = draw.textbbox((x, y), text, font=placeholder_font)
             text_w = text_bbox[2] - text_bbox[0]
@@ -1489,28 +2048,57 @@ class VideoProcessor:
             logger.error(f"Failed drawing placeholder box: {draw_e}")
 
 
+# --- Worker Functions ---
+def _init_worker(config_values: Dict[str, Any], parent_logger=None):
+    """Process pool initializer: restore runtime Config values and the parent's (enqueued) logger."""
+    global logger
+    for key, value in config_values.items():
+        setattr(Config, key, value)
+    if parent_logger is not None:
+        logger = parent_logger
+
+def process_one(video_path_str: str) -> Tuple[bool, str]:
+    """Process a single video. Module-level so it can run in a worker process. Returns (success, final file name)."""
+    video_file = Path(video_path_str)
+    logger.info(f"--- Starting: {video_file.name} ---")
+    try:
+        processor = VideoProcessor(video_file, Config)
+        return processor.run(), processor.video_path.name
+    except Exception as e:
+        # Catch unexpected errors during the processing of a single file
+        logger.exception(f"Unhandled exception processing {video_file.name}: {e}")
+        return False, video_file.name
+
+
 # --- Main Execution ---
 def main():
     """Main function to find videos and process them."""
     # --- GUI CODE START ---
-    root = tk.Tk()
-    root.withdraw()  # Hide the main Tkinter window
-    logger.info("Prompting user to select input folder via GUI...")
-    selected_folder = filedialog.askdirectory(title="Select Folder Containing Videos")
+    if Config.HEADLESS:
+        logger.info(f"PREVIEW_HEADLESS set, skipping folder dialog. Using configured folder: {Config.INPUT_FOLDER}")
+    else:
+        # Imported here so headless runs and worker processes never load tkinter
+        import tkinter as tk
+        from tkinter import filedialog
 
-    # Explicitly destroy the root window *after* the dialog is closed
-    try:
-        root.destroy()
-    except tk.TclError:
-        pass # Ignore error if window already destroyed (e.g., user closed it manually)
+        root = tk.Tk()
+        root.withdraw()  # Hide the main Tkinter window
+        logger.info("Prompting user to select input folder via GUI...")
+        selected_folder = filedialog.askdirectory(title="Select Folder Containing Videos")
 
-    if not selected_folder:
-        logger.error("No folder selected. Exiting.")
-        sys.exit(1)
+        # Explicitly destroy the root window *after* the dialog is closed
+        try:
+            root.destroy()
+        except tk.TclError:
+            pass # Ignore error if window already destroyed (e.g., user closed it manually)
 
-    # Update the Config class variable *before* validation
-    Config.INPUT_FOLDER = selected_folder
-    logger.info(f"User selected folder: {Config.INPUT_FOLDER}")
+        if not selected_folder:
+            logger.error("No folder selected. Exiting.")
+            sys.exit(1)
+
+        # Update the Config class variable *before* validation
+        Config.INPUT_FOLDER = selected_folder
+        logger.info(f"User selected folder: {Config.INPUT_FOLDER}")
     # --- GUI CODE END ---
 
     # --- SCRIPT INITIALIZATION ---
@@ -1533,10 +2121,11 @@ def main():
     # Setup logging configuration
     logger.remove() # Remove default handler
     # Console handler (INFO level)
-    logger.add(sys.stderr, level="INFO", format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>")
+    # enqueue=True makes the sinks safe to share with worker processes
+    logger.add(sys.stderr, level="INFO", enqueue=True, format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>")
     # File handler (DEBUG level)
     try:
-        logger.add(log_file_path, level="DEBUG", rotation="10 MB", retention="7 days", encoding='utf-8',
+        logger.add(log_file_path, level="DEBUG", rotation="10 MB", retention="7 days", encoding='utf-8', enqueue=True,
                    format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}")
         logger.info(f"Logging DEBUG information to: {log_file_path.resolve()}")
     except Exception as log_e:
@@ -1550,32 +2139,40 @@ def main():
     if not Config.validate():
         logger.error("Configuration validation failed. Please check settings. Exiting.")
         sys.exit(1)
+    # Once here, not in every worker process (the result travels with the other Config values)
+    Config.detect_hw_encoder()
 
     # --- FILE SCANNING ---
     input_folder = Path(Config.INPUT_FOLDER) # Use the validated path
-    excluded_lower = [f.lower() for f in Config.EXCLUDED_FILES if f] # Prepare lowercase list for efficient checking
+    excluded_lower = Config.EXCLUDED_FILES # Lowercased frozenset built by Config.validate()
     video_files_found = []
     try:
         logger.info(f"Scanning input folder for videos: {input_folder}")
-        items_in_folder = list(input_folder.iterdir())
-        logger.debug(f"Found {len(items_in_folder)} items in the folder.")
-
-        for item in items_in_folder:
+        valid_exts = Config.VALID_VIDEO_EXTENSIONS # Lowercased frozenset built by Config.validate()
+        # scandir entries carry the file type from the directory listing: no stat per item (except symlinks)
+        with os.scandir(input_folder) as it:
+            entries = list(it)
+        logger.debug(f"Found {len(entries)} items in the folder.")
+
+        for entry in entries:
+            try: is_file = entry.is_file()
+            except OSError: is_file = False
+            suffix = os.path.splitext(entry.name)[1].lower()
             # Check if it's a file and has a valid video extension
-            if item.is_file() and item.suffix.lower() in Config.VALID_VIDEO_EXTENSIONS:
+            if is_file and suffix in valid_exts:
                 # Check if it's in the exclusion list
-                if item.name.lower() not in excluded_lower:
-                    video_files_found.append(item)
-                    logger.debug(f"  Found video: {item.name}")
+                if entry.name.lower() not in excluded_lower:
+                    video_files_found.append(Path(entry.path))
+                    logger.debug(f"  Found video: {entry.name}")
                 else:
-                    logger.info(f"Skipping excluded file: {item.name}")
+                    logger.info(f"Skipping excluded file: {entry.name}")
             # Log reasons for skipping other items (optional, for debugging)
-            elif item.is_dir():
-                 logger.debug(f"Skipping directory: {item.name}")
-            elif not item.is_file():
-                 logger.debug(f"Skipping non-file item: {item.name}")
-            elif item.suffix.lower() not in Config.VALID_VIDEO_EXTENSIONS:
-                 logger.debug(f"Skipping file with non-video extension '{item.suffix}': {item.name}")
+            elif not is_file and entry.is_dir():
+                 logger.debug(f"Skipping directory: {entry.name}")
+            elif not is_file:
+                 logger.debug(f"Skipping non-file item: {entry.name}")
+            else:
+                 logger.debug(f"Skipping file with non-video extension '{suffix}': {entry.name}")
 
     except FileNotFoundError:
         # This should ideally be caught by Config.validate() after GUI selection
@@ -1594,39 +2191,48 @@ def main():
     else:
         total_files = len(video_files_found)
         logger.info(f"Found {total_files} video file(s) to process.")
-        processed_count = 0
         success_count = 0
         failure_count = 0
 
-        for i, video_file in enumerate(video_files_found):
-            current_file_num = i + 1
-            logger.info(f"--- [{current_file_num}/{total_files}] Starting: {video_file.name} ---")
-            processed_count += 1
-            try:
-                # Create processor instance for the video
-                processor = VideoProcessor(video_file, Config)
-                # Run the processing workflow
-                result = processor.run()
+        # Videos share no state, so they can run in separate processes. Prompts (input()) need the
+        # console though, so stay sequential whenever the user may be asked something.
+        workers = min(Config.MAX_PARALLEL_VIDEOS, total_files)
+        if workers > 1 and (Config.CONFIRM_CUT_POINTS_REQUIRED or not Config.IGNORE_EXISTING):
+            logger.info("Interactive prompts may be required (CONFIRM_CUT_POINTS_REQUIRED / IGNORE_EXISTING=False). Processing sequentially.")
+            workers = 1
+
+        executor = None
+        if workers > 1:
+            logger.info(f"Processing videos in parallel with {workers} worker processes.")
+            config_values = {k: v for k, v in vars(Config).items() if k.isupper()}
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_values, logger))
+            futures = {executor.submit(process_one, str(v)): v for v in video_files_found}
+            # Report each video as soon as it finishes, not in input order
+            outcomes = ((futures[f], *f.result()) for f in as_completed(futures))
+        else:
+            # Lazy: each video is processed as the loop advances
+            outcomes = ((v, *process_one(str(v))) for v in video_files_found)
 
+        try:
+            for i, (video_file, result, final_name) in enumerate(outcomes):
+                current_file_num = i + 1
                 if result:
                      success_count += 1
-                     logger.info(f"--- [{current_file_num}/{total_files}] Completed: {processor.video_path.name} ---") # Log final name
+                     logger.info(f"--- [{current_file_num}/{total_files}] Completed: {final_name} ---") # Log final name
                 else:
                      failure_count += 1
                      # Specific error logged within processor.run() or _check_existing_outputs()
                      logger.error(f"--- [{current_file_num}/{total_files}] Failed/Skipped: {video_file.name} ---")
-
-            except KeyboardInterrupt:
-                 logger.warning("--- Processing interrupted by user (Ctrl+C) ---")
-                 # Log which file was being processed when interrupted
-                 logger.warning(f"Interrupted while processing: {video_file.name}")
-                 failure_count += (total_files - i) # Count remaining files as failed/skipped due to interrupt
-                 break # Exit the loop immediately
-            except Exception as e:
-                # Catch unexpected errors during the processing of a single file
-                logger.exception(f"Unhandled exception processing {video_file.name}: {e}")
-                failure_count += 1
-                # Continue to the next file instead of exiting the script
+        except KeyboardInterrupt:
+             logger.warning("--- Processing interrupted by user (Ctrl+C) ---")
+             failure_count = total_files - success_count # Count remaining files as failed/skipped due to interrupt
+        except Exception as e:
+             # A worker process died (e.g. BrokenProcessPool); everything not yet reported counts as failed
+             logger.exception(f"Video processing pool failed: {e}")
+             failure_count = total_files - success_count
+        finally:
+             if executor:
+                 executor.shutdown(wait=True, cancel_futures=True)
 
     # --- SCRIPT COMPLETION ---
     end_time = datetime.now()